@@ -4,10 +4,24 @@ CurrentUserMiddleware
 Stores the current request user in a thread-local so that model signals
 can retrieve it via `get_current_user()` without needing the request object.
 
-Add to MIDDLEWARE in settings.py (after AuthenticationMiddleware):
+SystemLogFlushMiddleware
+────────────────────────
+Writes the buffered SystemLog entries in one bulk insert once the response
+has been sent, so the INSERT adds no latency for the client. The buffer is
+shared by the whole process, so the flush also writes entries that other
+threads' in-flight requests have buffered so far; each entry is an
+independent row, so writing it early is harmless.
+
+Add CurrentUserMiddleware to MIDDLEWARE in settings.py (after
+AuthenticationMiddleware):
 
     'car_trading.middleware.CurrentUserMiddleware',
 
+and SystemLogFlushMiddleware near the top, so it wraps every middleware
+that may log:
+
+    'car_trading.middleware.SystemLogFlushMiddleware',
+
 Usage in signals:
     from car_trading.middleware import get_current_user
     user = get_current_user()
@@ -37,3 +51,30 @@ class CurrentUserMiddleware:
             # served by the same thread.
             _thread_local.user = None
         return response
+
+
+class SystemLogFlushMiddleware:
+    def __init__(self, get_response):
+        from system_settings.models import SystemLog
+
+        self.get_response = get_response
+        self.flush = SystemLog.flush_buffer
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self.flush()
+            raise
+        close = response.close
+
+        def close_and_flush():
+            # The server calls close() once the body has been sent; flush
+            # before it fires request_finished, which closes the connection
+            try:
+                self.flush()
+            finally:
+                close()
+
+        response.close = close_and_flush
+        return response
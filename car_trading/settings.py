@@ -55,6 +55,7 @@ MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     # ↓ WhiteNoise must come right after SecurityMiddleware
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "car_trading.middleware.SystemLogFlushMiddleware",  # bulk-writes the request's buffered SystemLog entries
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -118,6 +119,14 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Loads the session user together with its UserProfile (one query, not two).
+# ModelBackend stays listed so sessions created before the switch, which
+# store its path, remain valid instead of logging everyone out.
+AUTHENTICATION_BACKENDS = [
+    "core.backends.ProfileModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 # ---------------------------------------------------------------------------
 # INTERNATIONALISATION
 # ---------------------------------------------------------------------------
@@ -170,6 +179,9 @@ DEFAULT_COMMISSION_RATE = 10.0
 SUPPORTED_CURRENCIES = ["USD", "CNY", "DA"]
 DEFAULT_CURRENCY = "DA"
 
+# SystemLog entries below this level (info < warning < error < critical) are dropped
+SYSTEMLOG_MIN_LEVEL = "info"
+
 USE_THOUSAND_SEPARATOR = True
 THOUSAND_SEPARATOR = ","
 DECIMAL_SEPARATOR = "."
@@ -0,0 +1,23 @@
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f"{namespace}:version"
+
+
+def versioned_key(namespace, *parts):
+    """Cache key under `namespace` that embeds the namespace's version counter.
+
+    bump_version(namespace) expires every key built this way at once,
+    without having to know which keys exist.
+    """
+    version = cache.get_or_set(_version_key(namespace), 1, None)
+    return ":".join([namespace, str(version), *map(str, parts)])
+
+
+def bump_version(namespace):
+    """Expire all versioned_key() entries of `namespace`"""
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), 1, None)
@@ -0,0 +1,86 @@
+from django import forms
+from django.core.cache import cache
+
+CHOICES_CACHE_TIMEOUT = 300
+
+
+def choices_cache_key(name):
+    """Cache key holding the prebuilt (pk, label) list for a dropdown"""
+    return f"choices:{name}"
+
+
+def invalidate_choices(*names):
+    """Drop cached dropdown choices (called from post_save/post_delete signals)"""
+    cache.delete_many([choices_cache_key(name) for name in names])
+
+
+class CachedModelChoiceIterator(forms.models.ModelChoiceIterator):
+    """Yield (pk, label) pairs from the cache instead of walking the queryset"""
+
+    def _cached_choices(self):
+        field = self.field
+        return cache.get_or_set(
+            choices_cache_key(field.cache_key),
+            lambda: [
+                (obj.pk, field.label_from_instance(obj))
+                for obj in self.queryset.iterator()
+            ],
+            CHOICES_CACHE_TIMEOUT,
+        )
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from self._cached_choices()
+
+    def __len__(self):
+        return len(self._cached_choices()) + (
+            1 if self.field.empty_label is not None else 0
+        )
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self._cached_choices())
+
+
+class CachedModelChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField whose rendered <option> list is cached by `cache_key`.
+
+    Validation still goes through the queryset; only the choice list used
+    for rendering is cached. Invalidate with `invalidate_choices(cache_key)`.
+    """
+
+    iterator = CachedModelChoiceIterator
+
+    def __init__(self, queryset, *, cache_key, **kwargs):
+        self.cache_key = cache_key
+        super().__init__(queryset, **kwargs)
+
+
+class CachedSelect(forms.Select):
+    """Select widget for fixed choice lists that memoizes its rendered HTML.
+
+    Output is keyed on (name, value, choices, attrs); values outside the
+    choice list are rendered normally and never cached.
+    """
+
+    _render_cache = {}
+
+    def render(self, name, value, attrs=None, renderer=None):
+        choices = tuple(self.choices)
+        value_key = "" if value is None else str(value)
+        if value_key not in {str(choice_value) for choice_value, _ in choices}:
+            return super().render(name, value, attrs, renderer)
+
+        key = (
+            name,
+            value_key,
+            choices,
+            tuple(sorted(self.build_attrs(self.attrs, attrs).items())),
+            renderer,
+        )
+        html = self._render_cache.get(key)
+        if html is None:
+            html = self._render_cache[key] = super().render(
+                name, value, attrs, renderer
+            )
+        return html
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCounter',
+            fields=[
+                ('prefix', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Counter',
+                'verbose_name_plural': 'Daily Counters',
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
@@ -119,6 +120,52 @@ class SystemSetting(models.Model):
             return self.value.lower() in ['true', '1', 'yes']
         return self.value
 
+class DailyCounter(models.Model):
+    """Last sequence number issued for a document-number prefix (e.g. VTE-20250101)"""
+    
+    prefix = models.CharField(max_length=20, primary_key=True)
+    value = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "Daily Counter"
+        verbose_name_plural = "Daily Counters"
+    
+    def __str__(self):
+        return f"{self.prefix}: {self.value}"
+    
+    @classmethod
+    def next_number(cls, prefix, model, field):
+        """Return the next "<prefix>-NNN" number for `model.field`.
+        
+        The counter row is bumped with a single UPDATE (row-locked until the
+        transaction ends), so concurrent saves cannot draw the same number.
+        A new prefix is seeded once from the highest number already stored.
+        """
+        with transaction.atomic():
+            cls.objects.get_or_create(
+                prefix=prefix,
+                # Callable defaults only run on create, so the scan of
+                # existing numbers happens once per prefix
+                defaults={'value': lambda: cls._last_issued(prefix, model, field)},
+            )
+            cls.objects.filter(pk=prefix).update(value=F('value') + 1)
+            value = cls.objects.filter(pk=prefix).values_list('value', flat=True).get()
+        return f"{prefix}-{value:03d}"
+    
+    @staticmethod
+    def _last_issued(prefix, model, field):
+        last = (
+            model.objects.filter(**{f'{field}__startswith': prefix})
+            .order_by(f'-{field}')
+            .values_list(field, flat=True)
+            .first()
+        )
+        try:
+            return int(last.split('-')[-1]) if last else 0
+        except ValueError:
+            return 0
+
+
 class BaseModel(models.Model):
     """Abstract base model with common fields"""
     
@@ -15,6 +15,9 @@ def create_user_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     """Save UserProfile when User is saved"""
+    # A login only touches last_login; re-saving the profile is wasted work
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
     if hasattr(instance, "userprofile"):
         instance.userprofile.save()
 
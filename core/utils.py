@@ -1,5 +1,6 @@
 from decimal import Decimal
 from django.conf import settings
+from django.db import connections
 from django.utils import timezone
 from .models import ExchangeRate, SystemSetting
 
@@ -147,4 +148,28 @@ def check_user_permission(user, permission_type, model_name=None):
     if 'all' in allowed_models:
         return True
     
-    return model_name in allowed_models if model_name else False
\ No newline at end of file
+    return model_name in allowed_models if model_name else False
+
+def estimate_row_count(table, using='default'):
+    """Row count estimate kept by the database catalog.
+
+    Cheap compared to COUNT(*) on large tables, but approximate. Returns None
+    when the backend keeps no estimate (SQLite) or the table is unknown.
+    """
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    elif connection.vendor == 'mysql':
+        sql = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        )
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
@@ -5,9 +5,22 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
 from core.models import BaseModel
+from purchases.models import landed_cost_da_expression
 from decimal import Decimal
 
 
+class VehicleQuerySet(models.QuerySet):
+    def with_landed_cost(self):
+        """
+        Annotate total_cost, the SQL equivalent of the landed_cost property,
+        so it can be filtered, summed and grouped without loading each
+        vehicle's purchase, freight and customs rows.
+        """
+        return self.annotate(
+            total_cost=landed_cost_da_expression("purchase_line_item__")
+        )
+
+
 class Vehicle(BaseModel):
     """Vehicle inventory record — linked to a PurchaseLineItem for cost tracking."""
 
@@ -68,6 +81,8 @@ class Vehicle(BaseModel):
         null=True, blank=True, verbose_name="Expiration réservation"
     )
 
+    objects = VehicleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Véhicule"
         verbose_name_plural = "Véhicules"
@@ -4,7 +4,7 @@ from django.core.validators import MinValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from decimal import Decimal
-from core.models import BaseModel
+from core.models import BaseModel, DailyCounter
 from sales.models import Invoice
 
 
@@ -97,40 +97,23 @@ class Payment(BaseModel):
 
         today = datetime.now()
         prefix = f"PAY-{today.strftime('%Y%m%d')}"
-        last = (
-            Payment.objects.filter(payment_number__startswith=prefix)
-            .order_by("-payment_number")
-            .first()
-        )
-        if last:
-            try:
-                new_num = int(last.payment_number.split("-")[-1]) + 1
-            except (ValueError, IndexError):
-                new_num = 1
-        else:
-            new_num = 1
-        return f"{prefix}-{new_num:03d}"
+        return DailyCounter.next_number(prefix, Payment, "payment_number")
 
     def update_invoice_balance(self):
         """Recalculate invoice totals from all confirmed payments."""
         if not self.invoice_id:
             return
 
-        # Re-fetch to avoid stale data
-        invoice = Invoice.objects.get(pk=self.invoice_id)
+        # Re-fetch to avoid stale data; Invoice.save() re-derives the tax
+        # amounts from the sale, so it is joined here
+        invoice = Invoice.objects.select_related("sale").get(pk=self.invoice_id)
 
         total_payments = invoice.payments.filter(is_confirmed=True).aggregate(
             total=models.Sum("amount")
         )["total"] or Decimal("0")
 
+        # Invoice.save() derives balance_due and status from amount_paid
         invoice.amount_paid = total_payments
-        invoice.balance_due = invoice.total_a_payer - total_payments
-
-        if invoice.balance_due <= 0:
-            invoice.status = "paid"
-        elif invoice.amount_paid > 0:
-            invoice.status = "issued"
-
         invoice.save()
 
 
@@ -1,5 +1,7 @@
 from django.utils import timezone
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from core.models import BaseModel, Currency
@@ -272,6 +274,49 @@ class PurchaseLineItem(BaseModel):
         )
 
 
+def landed_cost_da_expression(prefix=""):
+    """
+    SQL equivalent of PurchaseLineItem.landed_cost_da.
+
+    `prefix` is the lookup path from the queried model to the line item, e.g.
+    "" on PurchaseLineItem, "purchase_line_item__" on Vehicle or
+    "vehicle__purchase_line_item__" on SaleLineItem. Rows without a line item
+    evaluate to 0.
+    """
+    money = models.DecimalField(max_digits=15, decimal_places=2)
+    zero = Value(Decimal("0"), output_field=money)
+
+    def is_set(path):
+        # Mirrors the Python truthiness test: neither NULL nor 0
+        return Q(**{f"{path}__isnull": False}) & ~Q(**{path: 0})
+
+    def share(own_path, container_path):
+        return Case(
+            When(is_set(own_path), then=F(own_path)),
+            When(is_set(container_path), then=F(container_path) / sibling_count),
+            default=zero,
+            output_field=money,
+        )
+
+    sibling_count = Subquery(
+        PurchaseLineItem.objects.filter(purchase=OuterRef(f"{prefix}purchase"))
+        .order_by()
+        .values("purchase")
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+
+    freight = share(
+        f"{prefix}freight_cost__total_freight_cost_da",
+        f"{prefix}purchase__freight_cost__total_freight_cost_da",
+    )
+    customs = share(
+        f"{prefix}customs_declaration__total_customs_cost_da",
+        f"{prefix}purchase__customs_declaration__total_customs_cost_da",
+    )
+    return Coalesce(F(f"{prefix}fob_price_da"), zero) + freight + customs
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 
 
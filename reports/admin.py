@@ -34,6 +34,7 @@ class ScheduledReportAdmin(admin.ModelAdmin):
         'last_run', 'status'
     )
     list_filter = ('frequency', 'status', 'next_run')
+    list_select_related = ('template',)
     search_fields = ('name', 'template__name')
     filter_horizontal = ('recipients',)
     
@@ -56,6 +57,7 @@ class ReportExecutionAdmin(admin.ModelAdmin):
         'status', 'record_count', 'duration'
     )
     list_filter = ('status', 'start_time', 'template__report_type')
+    list_select_related = ('template', 'executed_by')
     search_fields = ('template__name', 'executed_by__username')
     readonly_fields = ('duration',)
     
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class ReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reports'
-    verbose_name = 'Reports & Analytics'
\ No newline at end of file
+    verbose_name = 'Reports & Analytics'
+
+    def ready(self):
+        import reports.signals  # noqa
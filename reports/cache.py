@@ -0,0 +1,13 @@
+from core.cache import bump_version, versioned_key
+
+CHART_CACHE_TIMEOUT = 300
+
+
+def chart_cache_key(chart_type, period, day):
+    """Cache key for one ajax_chart_data payload"""
+    return versioned_key("chart", chart_type, period, day.isoformat())
+
+
+def invalidate_charts():
+    """Expire all cached chart payloads (called from post_save/post_delete signals)"""
+    bump_version("chart")
@@ -1,41 +1,111 @@
+import functools
+
 from django import forms
-from crispy_forms.helper import FormHelper
-from crispy_forms.layout import Layout, Row, Column, Submit
+from django.utils import timezone
+from django.utils.functional import cached_property
+from dateutil.relativedelta import relativedelta
 from django.contrib.auth.models import User
 from customers.models import Customer
 from suppliers.models import Supplier
+from core.forms import CachedModelChoiceField
 
-class ProfitAnalysisForm(forms.Form):
-    """Form for profit analysis report filters"""
-    
-    date_from = forms.DateField(
-        required=False,
-        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
-    )
-    
-    date_to = forms.DateField(
+
+# ── Fixed choice lists ───────────────────────────────────────────────────────
+
+GROUP_BY_CHOICES = (
+    ('month', 'Par mois'),
+    ('trader', 'Par trader'),
+    ('customer', 'Par client'),
+    ('vehicle_make', 'Par marque'),
+)
+
+INVENTORY_STATUS_CHOICES = (
+    ('in_transit', 'En Transit'),
+    ('at_customs', 'En Douane'),
+    ('available', 'Disponible'),
+    ('reserved', 'Réservé'),
+    ('sold', 'Vendu'),
+)
+
+PERIOD_TYPE_CHOICES = (
+    ('daily', 'Quotidien'),
+    ('weekly', 'Hebdomadaire'),
+    ('monthly', 'Mensuel'),
+    ('quarterly', 'Trimestriel'),
+    ('yearly', 'Annuel'),
+)
+
+PAYMENT_METHOD_CHOICES = (
+    ('', 'Tous les modes'),
+    ('cash', 'Espèces'),
+    ('bank_transfer', 'Virement Bancaire'),
+    ('installment', 'Paiement Échelonné'),
+    ('check', 'Chèque'),
+)
+
+INVOICE_STATUS_CHOICES = (
+    ('issued', 'Émise'),
+    ('paid', 'Payée'),
+    ('cancelled', 'Annulée'),
+)
+
+EXPORT_FORMATS = (
+    ('excel', 'Excel (.xlsx)'),
+    ('csv', 'CSV'),
+    ('pdf', 'PDF'),
+)
+
+
+# ── Cached dropdown fields ───────────────────────────────────────────────────
+
+class TraderChoiceField(CachedModelChoiceField):
+    """Trader select labelled by full name, falling back to username"""
+
+    def label_from_instance(self, obj):
+        return obj.get_full_name() or obj.username
+
+
+class CustomerChoiceField(CachedModelChoiceField):
+    """Customer select labelled by name only"""
+
+    def label_from_instance(self, obj):
+        return obj.name
+
+
+# ── Shared field builders ────────────────────────────────────────────────────
+
+def _date_field():
+    return forms.DateField(
         required=False,
         widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
     )
-    
-    trader = forms.ModelChoiceField(
+
+
+def _trader_field():
+    return TraderChoiceField(
         queryset=User.objects.filter(
             userprofile__role__in=['trader', 'manager'],
             is_active=True
         ),
+        cache_key='traders',
         required=False,
         empty_label="Tous les traders",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    
-    customer = forms.ModelChoiceField(
+
+
+def _customer_field():
+    return CustomerChoiceField(
         queryset=Customer.objects.filter(is_active=True),
+        cache_key='customers',
         required=False,
         empty_label="Tous les clients",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    
-    vehicle_make = forms.CharField(
+
+
+def _vehicle_make_field():
+    return forms.CharField(
         max_length=100,
         required=False,
         widget=forms.TextInput(attrs={
@@ -43,341 +113,226 @@ class ProfitAnalysisForm(forms.Form):
             'class': 'form-control'
         })
     )
-    
-    min_margin = forms.DecimalField(
+
+
+def _amount_field(placeholder):
+    return forms.DecimalField(
         required=False,
         widget=forms.NumberInput(attrs={
             'step': '0.01',
-            'placeholder': 'Marge minimum (DA)',
+            'placeholder': placeholder,
             'class': 'form-control'
         })
     )
-    
-    group_by = forms.ChoiceField(
-        choices=[
-            ('month', 'Par mois'),
-            ('trader', 'Par trader'),
-            ('customer', 'Par client'),
-            ('vehicle_make', 'Par marque'),
-        ],
-        initial='month',
-        widget=forms.Select(attrs={'class': 'form-control'})
+
+
+def _integer_field(placeholder):
+    return forms.IntegerField(
+        required=False,
+        widget=forms.NumberInput(attrs={
+            'placeholder': placeholder,
+            'class': 'form-control'
+        })
     )
-    
+
+
+@functools.cache
+def _crispy():
+    """Import crispy-forms on first use so non-rendering callers skip it"""
+    from crispy_forms.helper import FormHelper
+    from crispy_forms.layout import Layout, Row, Column, Submit
+    return FormHelper, Layout, Row, Column, Submit
+
+
+class BaseReportForm(forms.Form):
+    """Common base for report filter forms.
+
+    `layout_spec` lists the crispy layout items: a field name, or a tuple of
+    field names for a row of half-width columns. The Layout is built from it
+    once per class, and the FormHelper only when a template renders the form
+    with {% crispy %}. When `default_range_months` is set and no date_from was
+    submitted, date_from/date_to default to that many months back from today.
+    """
+
+    layout_spec = ()
+    submit_label = 'Générer le Rapport'
+    submit_css_class = 'btn btn-primary'
+    default_range_months = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            Row(
-                Column('date_from', css_class='form-group col-md-6'),
-                Column('date_to', css_class='form-group col-md-6'),
-            ),
-            Row(
-                Column('trader', css_class='form-group col-md-6'),
-                Column('customer', css_class='form-group col-md-6'),
-            ),
-            Row(
-                Column('vehicle_make', css_class='form-group col-md-6'),
-                Column('min_margin', css_class='form-group col-md-6'),
-            ),
-            'group_by',
-            Submit('submit', 'Générer le Rapport', css_class='btn btn-primary')
-        )
-        
-        # Set default date range (last 3 months)
-        if not self.data.get('date_from'):
-            from django.utils import timezone
-            from dateutil.relativedelta import relativedelta
-            
+
+        if self.default_range_months and not self.data.get('date_from'):
             today = timezone.now().date()
-            three_months_ago = today - relativedelta(months=3)
-            
-            self.fields['date_from'].initial = three_months_ago
+            self.fields['date_from'].initial = today - relativedelta(
+                months=self.default_range_months
+            )
             self.fields['date_to'].initial = today
 
-class InventoryStatusForm(forms.Form):
+    @classmethod
+    def get_layout(cls):
+        if '_layout' not in cls.__dict__:
+            _, Layout, Row, Column, Submit = _crispy()
+            items = [
+                Row(*[
+                    Column(name, css_class='form-group col-md-6') for name in item
+                ]) if isinstance(item, tuple) else item
+                for item in cls.layout_spec
+            ]
+            cls._layout = Layout(
+                *items,
+                Submit('submit', cls.submit_label, css_class=cls.submit_css_class)
+            )
+        return cls._layout
+
+    @cached_property
+    def helper(self):
+        FormHelper = _crispy()[0]
+        helper = FormHelper()
+        helper.layout = self.get_layout()
+        return helper
+
+
+class ProfitAnalysisForm(BaseReportForm):
+    """Form for profit analysis report filters"""
+
+    date_from = _date_field()
+    date_to = _date_field()
+    trader = _trader_field()
+    customer = _customer_field()
+    vehicle_make = _vehicle_make_field()
+    min_margin = _amount_field('Marge minimum (DA)')
+
+    group_by = forms.ChoiceField(
+        choices=GROUP_BY_CHOICES,
+        initial='month',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    # Default date range: last 3 months
+    default_range_months = 3
+
+    layout_spec = (
+        ('date_from', 'date_to'),
+        ('trader', 'customer'),
+        ('vehicle_make', 'min_margin'),
+        'group_by',
+    )
+
+class InventoryStatusForm(BaseReportForm):
     """Form for inventory status report filters"""
-    
+
     status = forms.MultipleChoiceField(
-        choices=[
-            ('in_transit', 'En Transit'),
-            ('at_customs', 'En Douane'),
-            ('available', 'Disponible'),
-            ('reserved', 'Réservé'),
-            ('sold', 'Vendu'),
-        ],
+        choices=INVENTORY_STATUS_CHOICES,
         required=False,
         widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'})
     )
-    
-    supplier = forms.ModelChoiceField(
+
+    supplier = CachedModelChoiceField(
         queryset=Supplier.objects.filter(is_active=True),
+        cache_key='suppliers',
         required=False,
         empty_label="Tous les fournisseurs",
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    
-    vehicle_make = forms.CharField(
-        max_length=100,
-        required=False,
-        widget=forms.TextInput(attrs={
-            'placeholder': 'Marque de véhicule',
-            'class': 'form-control'
-        })
-    )
-    
-    year_from = forms.IntegerField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'placeholder': 'Année min',
-            'class': 'form-control'
-        })
-    )
-    
-    year_to = forms.IntegerField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'placeholder': 'Année max',
-            'class': 'form-control'
-        })
-    )
-    
-    min_landed_cost = forms.DecimalField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'step': '0.01',
-            'placeholder': 'Coût minimum (DA)',
-            'class': 'form-control'
-        })
-    )
-    
-    max_landed_cost = forms.DecimalField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'step': '0.01',
-            'placeholder': 'Coût maximum (DA)',
-            'class': 'form-control'
-        })
-    )
-    
-    days_in_stock_min = forms.IntegerField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'placeholder': 'Jours min en stock',
-            'class': 'form-control'
-        })
+
+    vehicle_make = _vehicle_make_field()
+    year_from = _integer_field('Année min')
+    year_to = _integer_field('Année max')
+    min_landed_cost = _amount_field('Coût minimum (DA)')
+    max_landed_cost = _amount_field('Coût maximum (DA)')
+    days_in_stock_min = _integer_field('Jours min en stock')
+
+    layout_spec = (
+        'status',
+        ('supplier', 'vehicle_make'),
+        ('year_from', 'year_to'),
+        ('min_landed_cost', 'max_landed_cost'),
+        'days_in_stock_min',
     )
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            'status',
-            Row(
-                Column('supplier', css_class='form-group col-md-6'),
-                Column('vehicle_make', css_class='form-group col-md-6'),
-            ),
-            Row(
-                Column('year_from', css_class='form-group col-md-6'),
-                Column('year_to', css_class='form-group col-md-6'),
-            ),
-            Row(
-                Column('min_landed_cost', css_class='form-group col-md-6'),
-                Column('max_landed_cost', css_class='form-group col-md-6'),
-            ),
-            'days_in_stock_min',
-            Submit('submit', 'Générer le Rapport', css_class='btn btn-primary')
-        )
-
-class SalesSummaryForm(forms.Form):
+
+class SalesSummaryForm(BaseReportForm):
     """Form for sales summary report filters"""
-    
+
     period_type = forms.ChoiceField(
-        choices=[
-            ('daily', 'Quotidien'),
-            ('weekly', 'Hebdomadaire'),
-            ('monthly', 'Mensuel'),
-            ('quarterly', 'Trimestriel'),
-            ('yearly', 'Annuel'),
-        ],
+        choices=PERIOD_TYPE_CHOICES,
         initial='monthly',
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    
-    date_from = forms.DateField(
-        required=False,
-        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
-    )
-    
-    date_to = forms.DateField(
-        required=False,
-        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
-    )
-    
-    trader = forms.ModelChoiceField(
-        queryset=User.objects.filter(
-            userprofile__role__in=['trader', 'manager'],
-            is_active=True
-        ),
-        required=False,
-        empty_label="Tous les traders",
-        widget=forms.Select(attrs={'class': 'form-control'})
-    )
-    
+
+    date_from = _date_field()
+    date_to = _date_field()
+    trader = _trader_field()
+
     payment_method = forms.ChoiceField(
-        choices=[('', 'Tous les modes')] + [
-            ('cash', 'Espèces'),
-            ('bank_transfer', 'Virement Bancaire'),
-            ('installment', 'Paiement Échelonné'),
-            ('check', 'Chèque'),
-        ],
+        choices=PAYMENT_METHOD_CHOICES,
         required=False,
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    
+
     include_charts = forms.BooleanField(
         required=False,
         initial=True,
         label="Inclure les graphiques",
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            'period_type',
-            Row(
-                Column('date_from', css_class='form-group col-md-6'),
-                Column('date_to', css_class='form-group col-md-6'),
-            ),
-            Row(
-                Column('trader', css_class='form-group col-md-6'),
-                Column('payment_method', css_class='form-group col-md-6'),
-            ),
-            'include_charts',
-            Submit('submit', 'Générer le Rapport', css_class='btn btn-primary')
-        )
-        
-        # Set default date range (last 12 months)
-        if not self.data.get('date_from'):
-            from django.utils import timezone
-            from dateutil.relativedelta import relativedelta
-            
-            today = timezone.now().date()
-            twelve_months_ago = today - relativedelta(months=12)
-            
-            self.fields['date_from'].initial = twelve_months_ago
-            self.fields['date_to'].initial = today
 
-class PaymentStatusForm(forms.Form):
+    # Default date range: last 12 months
+    default_range_months = 12
+
+    layout_spec = (
+        'period_type',
+        ('date_from', 'date_to'),
+        ('trader', 'payment_method'),
+        'include_charts',
+    )
+
+class PaymentStatusForm(BaseReportForm):
     """Form for payment status report filters"""
-    
+
     invoice_status = forms.MultipleChoiceField(
-        choices=[
-            ('issued', 'Émise'),
-            ('paid', 'Payée'),
-            ('cancelled', 'Annulée'),
-        ],
+        choices=INVOICE_STATUS_CHOICES,
         required=False,
         widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'})
     )
-    
+
     overdue_only = forms.BooleanField(
         required=False,
         label="Factures en retard seulement",
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
-    
-    days_overdue_min = forms.IntegerField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'placeholder': 'Jours de retard minimum',
-            'class': 'form-control'
-        })
-    )
-    
-    customer = forms.ModelChoiceField(
-        queryset=Customer.objects.filter(is_active=True),
-        required=False,
-        empty_label="Tous les clients",
-        widget=forms.Select(attrs={'class': 'form-control'})
-    )
-    
-    trader = forms.ModelChoiceField(
-        queryset=User.objects.filter(
-            userprofile__role__in=['trader', 'manager'],
-            is_active=True
-        ),
-        required=False,
-        empty_label="Tous les traders",
-        widget=forms.Select(attrs={'class': 'form-control'})
-    )
-    
-    amount_min = forms.DecimalField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'step': '0.01',
-            'placeholder': 'Montant minimum (DA)',
-            'class': 'form-control'
-        })
-    )
-    
-    amount_max = forms.DecimalField(
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'step': '0.01',
-            'placeholder': 'Montant maximum (DA)',
-            'class': 'form-control'
-        })
+
+    days_overdue_min = _integer_field('Jours de retard minimum')
+    customer = _customer_field()
+    trader = _trader_field()
+    amount_min = _amount_field('Montant minimum (DA)')
+    amount_max = _amount_field('Montant maximum (DA)')
+
+    layout_spec = (
+        'invoice_status',
+        ('overdue_only', 'days_overdue_min'),
+        ('customer', 'trader'),
+        ('amount_min', 'amount_max'),
     )
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            'invoice_status',
-            Row(
-                Column('overdue_only', css_class='form-group col-md-6'),
-                Column('days_overdue_min', css_class='form-group col-md-6'),
-            ),
-            Row(
-                Column('customer', css_class='form-group col-md-6'),
-                Column('trader', css_class='form-group col-md-6'),
-            ),
-            Row(
-                Column('amount_min', css_class='form-group col-md-6'),
-                Column('amount_max', css_class='form-group col-md-6'),
-            ),
-            Submit('submit', 'Générer le Rapport', css_class='btn btn-primary')
-        )
-
-class ReportExportForm(forms.Form):
+
+class ReportExportForm(BaseReportForm):
     """Form for report export options"""
-    
-    EXPORT_FORMATS = [
-        ('excel', 'Excel (.xlsx)'),
-        ('csv', 'CSV'),
-        ('pdf', 'PDF'),
-    ]
-    
+
+    EXPORT_FORMATS = EXPORT_FORMATS
+
     format = forms.ChoiceField(
         choices=EXPORT_FORMATS,
         initial='excel',
         widget=forms.Select(attrs={'class': 'form-control'})
     )
-    
+
     include_charts = forms.BooleanField(
         required=False,
         initial=True,
         label="Inclure les graphiques (PDF seulement)",
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
-    
+
     email_to = forms.EmailField(
         required=False,
         widget=forms.EmailInput(attrs={
@@ -385,14 +340,11 @@ class ReportExportForm(forms.Form):
             'class': 'form-control'
         })
     )
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            'format',
-            'include_charts',
-            'email_to',
-            Submit('submit', 'Exporter', css_class='btn btn-success')
-        )
\ No newline at end of file
+
+    layout_spec = (
+        'format',
+        'include_charts',
+        'email_to',
+    )
+    submit_label = 'Exporter'
+    submit_css_class = 'btn btn-success'
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 11:29
+
+import reports.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reporttemplate',
+            name='allowed_roles',
+            field=models.JSONField(default=reports.models._empty_list, verbose_name='Rôles autorisés'),
+        ),
+        migrations.AlterField(
+            model_name='reporttemplate',
+            name='filter_parameters',
+            field=models.JSONField(default=reports.models._empty_dict, verbose_name='Paramètres de filtre'),
+        ),
+    ]
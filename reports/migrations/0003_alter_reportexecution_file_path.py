@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 11:29
+
+from django.db import migrations, models
+from django.db.models.functions import Length, Substr
+
+
+def truncate_long_file_paths(apps, schema_editor):
+    ReportExecution = apps.get_model('reports', 'ReportExecution')
+    ReportExecution.objects.annotate(
+        file_path_length=Length('file_path')
+    ).filter(file_path_length__gt=255).update(file_path=Substr('file_path', 1, 255))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_alter_reporttemplate_allowed_roles_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(truncate_long_file_paths, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reportexecution',
+            name='file_path',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Chemin du fichier'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-16 11:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_alter_reportexecution_file_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reportexecution',
+            index=models.Index(condition=models.Q(('status', 'running')), fields=['status', '-start_time'], name='rep_running_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduledreport',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['status', 'next_run'], name='sched_active_idx'),
+        ),
+    ]
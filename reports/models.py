@@ -3,6 +3,15 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from core.models import BaseModel
 
+
+def _empty_dict():
+    return {}
+
+
+def _empty_list():
+    return []
+
+
 class ReportTemplate(BaseModel):
     """Saved report templates"""
     
@@ -24,7 +33,7 @@ class ReportTemplate(BaseModel):
     
     # Filter parameters (stored as JSON)
     filter_parameters = models.JSONField(
-        default=dict,
+        default=_empty_dict,
         verbose_name="Paramètres de filtre"
     )
     
@@ -34,7 +43,7 @@ class ReportTemplate(BaseModel):
         verbose_name="Rapport public"
     )
     allowed_roles = models.JSONField(
-        default=list,
+        default=_empty_list,
         verbose_name="Rôles autorisés"
     )
     
@@ -71,6 +80,7 @@ class ScheduledReport(BaseModel):
         ('monthly', 'Mensuel'),
         ('quarterly', 'Trimestriel'),
     ]
+    _FREQUENCY_DISPLAY = dict(FREQUENCY_CHOICES)
     
     STATUS_CHOICES = [
         ('active', 'Actif'),
@@ -117,9 +127,24 @@ class ScheduledReport(BaseModel):
         verbose_name = "Rapport planifié"
         verbose_name_plural = "Rapports planifiés"
         ordering = ['next_run']
+        indexes = [
+            # Scheduler polling: active reports due to run
+            models.Index(
+                fields=['status', 'next_run'],
+                name='sched_active_idx',
+                condition=models.Q(status='active'),
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.name} ({self.get_frequency_display()})"
+        frequency = self._FREQUENCY_DISPLAY.get(self.frequency, self.frequency)
+        return f"{self.name} ({frequency})"
+
+class ReportExecutionManager(models.Manager):
+    """Always join the template, which __str__ reads"""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('template')
 
 class ReportExecution(BaseModel):
     """Report execution log"""
@@ -161,8 +186,9 @@ class ReportExecution(BaseModel):
         null=True, blank=True,
         verbose_name="Nombre d'enregistrements"
     )
+    # Storage-relative key; see file_url for the public URL
     file_path = models.CharField(
-        max_length=500, blank=True,
+        max_length=255, blank=True,
         verbose_name="Chemin du fichier"
     )
     error_message = models.TextField(
@@ -170,10 +196,20 @@ class ReportExecution(BaseModel):
         verbose_name="Message d'erreur"
     )
     
+    objects = ReportExecutionManager()
+    
     class Meta:
         verbose_name = "Exécution de rapport"
         verbose_name_plural = "Exécutions de rapport"
         ordering = ['-start_time']
+        indexes = [
+            # Still-running executions (stale run sweep)
+            models.Index(
+                fields=['status', '-start_time'],
+                name='rep_running_idx',
+                condition=models.Q(status='running'),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.template.name} - {self.start_time.strftime('%d/%m/%Y %H:%M')}"
@@ -185,6 +221,14 @@ class ReportExecution(BaseModel):
             return self.end_time - self.start_time
         return None
     
+    @property
+    def file_url(self):
+        """URL of the generated file, resolved through the default storage"""
+        if not self.file_path:
+            return ''
+        from django.core.files.storage import default_storage
+        return default_storage.url(self.file_path)
+    
     def mark_completed(self, record_count=None, file_path=None):
         """Mark execution as completed"""
         self.status = 'completed'
@@ -193,11 +237,13 @@ class ReportExecution(BaseModel):
             self.record_count = record_count
         if file_path:
             self.file_path = file_path
-        self.save()
+        self.save(update_fields=[
+            'status', 'end_time', 'record_count', 'file_path', 'updated_at'
+        ])
     
     def mark_failed(self, error_message):
         """Mark execution as failed"""
         self.status = 'failed'
         self.end_time = timezone.now()
         self.error_message = error_message
-        self.save()
\ No newline at end of file
+        self.save(update_fields=['status', 'end_time', 'error_message', 'updated_at'])
\ No newline at end of file
@@ -0,0 +1,49 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.contrib.auth.models import User
+from core.forms import invalidate_choices
+from core.models import UserProfile
+from customers.models import Customer
+from inventory.models import Vehicle
+from sales.models import Sale, SaleLineItem
+from suppliers.models import Supplier
+from .cache import invalidate_charts
+
+
+# ── Report filter dropdown cache invalidation ────────────────────────────────
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_trader_choices(sender, instance, **kwargs):
+    # update_last_login saves the User on every sign-in; names are unchanged
+    if kwargs.get("update_fields") == frozenset({"last_login"}):
+        return
+    invalidate_choices("traders")
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+def invalidate_customer_choices(sender, instance, **kwargs):
+    invalidate_choices("customers")
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def invalidate_supplier_choices(sender, instance, **kwargs):
+    invalidate_choices("suppliers")
+
+
+# ── Chart data cache invalidation ────────────────────────────────────────────
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+@receiver(post_save, sender=SaleLineItem)
+@receiver(post_delete, sender=SaleLineItem)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_delete, sender=Vehicle)
+def invalidate_chart_data(sender, instance, **kwargs):
+    invalidate_charts()
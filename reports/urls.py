@@ -1,14 +1,19 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 app_name = 'reports'
 
+# Ordered by request frequency: the chart endpoint is polled by the dashboard
+ajax_urlpatterns = [
+    path('chart-data/', views.ajax_chart_data, name='ajax_chart_data'),
+]
+
 urlpatterns = [
+    path('ajax/', include(ajax_urlpatterns)),
     path('', views.dashboard, name='dashboard'),
     path('profit-analysis/', views.profit_analysis, name='profit_analysis'),
     path('inventory-status/', views.inventory_status, name='inventory_status'),
     path('sales-summary/', views.sales_summary, name='sales_summary'),
     path('payment-status/', views.payment_status, name='payment_status'),
     path('export/', views.export_report, name='export_report'),
-    path('ajax/chart-data/', views.ajax_chart_data, name='ajax_chart_data'),
-]
\ No newline at end of file
+]
@@ -2,11 +2,29 @@ from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Q, Sum, Count, Avg, F, Case, When, DecimalField
+from django.db.models import (
+    Q,
+    Sum,
+    Count,
+    Avg,
+    F,
+    Prefetch,
+    Case,
+    When,
+    DecimalField,
+    OuterRef,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim, TruncMonth
+from django.core.cache import cache
 from django.http import JsonResponse, HttpResponse
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+import functools
+import io
 import json
 
 from .forms import (
@@ -23,6 +41,7 @@ from commissions.models import CommissionSummary
 from customers.models import Customer
 from suppliers.models import Supplier
 from core.decorators import manager_required
+from .cache import CHART_CACHE_TIMEOUT, chart_cache_key
 
 
 @login_required
@@ -37,37 +56,27 @@ def dashboard(request):
         sale_date__gte=current_month, is_finalized=True
     )
 
-    # Inventory statistics
-    inventory_stats = {
-        "total_vehicles": Vehicle.objects.count(),
-        "available_vehicles": Vehicle.objects.filter(status="available").count(),
-        "in_transit": Vehicle.objects.filter(status="in_transit").count(),
-        "at_customs": Vehicle.objects.filter(status="at_customs").count(),
-    }
+    # Inventory statistics — one query with conditional counts
+    inventory_stats = Vehicle.objects.aggregate(
+        total_vehicles=Count("id"),
+        available_vehicles=Count("id", filter=Q(status="available")),
+        in_transit=Count("id", filter=Q(status="in_transit")),
+        at_customs=Count("id", filter=Q(status="at_customs")),
+    )
 
-    # Financial statistics
-    # sale_price is a Python property (sum of line_items); aggregate via the FK
-    monthly_revenue = monthly_sales_qs.aggregate(total=Sum("line_items__sale_price"))[
-        "total"
-    ] or Decimal("0")
-
-    # margin_amount also depends on landed_cost (a property); compute in Python
-    monthly_sales_list = list(
-        monthly_sales_qs.prefetch_related(
-            "line_items__vehicle__purchase_line_item__purchase__freight_cost",
-            "line_items__vehicle__purchase_line_item__purchase__customs_declaration",
-        )
+    # Financial statistics — revenue and margin from the with_margin() annotations
+    monthly_totals = monthly_sales_qs.with_margin().aggregate(
+        monthly_revenue=Sum("total_price"), monthly_margin=Sum("margin")
+    )
+    outstanding = Invoice.objects.filter(balance_due__gt=0).aggregate(
+        count=Count("id"), total=Sum("balance_due")
     )
-    monthly_margin = sum(sale.margin_amount for sale in monthly_sales_list)
 
     financial_stats = {
-        "monthly_revenue": monthly_revenue,
-        "monthly_margin": monthly_margin,
-        "outstanding_invoices": Invoice.objects.filter(balance_due__gt=0).count(),
-        "total_outstanding": Invoice.objects.filter(balance_due__gt=0).aggregate(
-            Sum("balance_due")
-        )["balance_due__sum"]
-        or 0,
+        "monthly_revenue": monthly_totals["monthly_revenue"] or Decimal("0"),
+        "monthly_margin": monthly_totals["monthly_margin"] or Decimal("0"),
+        "outstanding_invoices": outstanding["count"],
+        "total_outstanding": outstanding["total"] or 0,
     }
 
     # Top traders — revenue via line_items__sale_price to stay at DB level
@@ -83,13 +92,28 @@ def dashboard(request):
         .order_by("-total_revenue")[:5]
     )
 
-    # Recent finalized sales — no direct vehicle FK on Sale anymore
+    # Recent finalized sales — no direct vehicle FK on Sale anymore. Price and
+    # margin come from the with_margin() annotations; only() trims the joined
+    # rows to the columns the dashboard table shows
     recent_sales = (
-        Sale.objects.filter(is_finalized=True)
+        Sale.objects.with_margin()
+        .filter(is_finalized=True)
         .select_related("customer", "assigned_trader")
+        .only(
+            "sale_date",
+            "commission_amount",
+            "customer__name",
+            "assigned_trader__username",
+            "assigned_trader__first_name",
+            "assigned_trader__last_name",
+        )
         .prefetch_related(
-            "line_items__vehicle__purchase_line_item__purchase__freight_cost",
-            "line_items__vehicle__purchase_line_item__purchase__customs_declaration",
+            Prefetch(
+                "line_items",
+                SaleLineItem.objects.select_related("vehicle").only(
+                    "sale", "vehicle__make", "vehicle__model", "vehicle__year"
+                ),
+            )
         )
         .order_by("-sale_date")[:5]
     )
@@ -104,6 +128,32 @@ def dashboard(request):
     return render(request, "reports/dashboard.html", context)
 
 
+def _full_name(prefix=""):
+    """SQL equivalent of `user.get_full_name() or user.username` for the User
+    reached through `prefix` (e.g. "assigned_trader__")"""
+    return Coalesce(
+        NullIf(
+            Trim(Concat(f"{prefix}first_name", Value(" "), f"{prefix}last_name")),
+            Value(""),
+        ),
+        f"{prefix}username",
+    )
+
+
+def _grouped_row(label, row):
+    """Shape one GROUP BY row of profit_analysis for the template and chart"""
+    revenue = row["revenue"] or Decimal("0")
+    margin = row["profit"] or Decimal("0")
+    return {
+        "label": label,
+        "sales_count": row["sales_count"],
+        "revenue": revenue,
+        "margin": margin,
+        "commission": row["commission"] or Decimal("0"),
+        "margin_percentage": (margin / revenue * 100) if revenue > 0 else 0,
+    }
+
+
 @login_required
 def profit_analysis(request):
     """Profit analysis report"""
@@ -112,13 +162,9 @@ def profit_analysis(request):
 
     # Base queryset — vehicle is now reached via line_items
     sales = (
-        Sale.objects.filter(is_finalized=True)
+        Sale.objects.with_margin()
+        .filter(is_finalized=True)
         .select_related("customer", "assigned_trader")
-        .prefetch_related(
-            "line_items__vehicle__purchase_line_item__purchase__freight_cost",
-            "line_items__vehicle__purchase_line_item__purchase__customs_declaration",
-            "line_items__vehicle__purchase_line_item__purchase__supplier",
-        )
     )
 
     # Apply filters
@@ -139,208 +185,155 @@ def profit_analysis(request):
         if customer:
             sales = sales.filter(customer=customer)
 
-        # vehicle_make is now on the line item's vehicle, not directly on Sale
+        # vehicle_make is on the line item's vehicle; a pk__in subquery keeps
+        # one row per sale for the GROUP BY queries below
         vehicle_make = form.cleaned_data.get("vehicle_make")
         if vehicle_make:
             sales = sales.filter(
-                line_items__vehicle__make__icontains=vehicle_make
-            ).distinct()
+                pk__in=SaleLineItem.objects.filter(
+                    vehicle__make__icontains=vehicle_make
+                ).values("sale")
+            )
 
         min_margin = form.cleaned_data.get("min_margin")
         if min_margin:
-            # margin_amount is a Python property — filter in Python
-            sales = [sale for sale in sales if sale.margin_amount >= min_margin]
+            # margin is annotated by with_margin(), so this stays in SQL
+            sales = sales.filter(margin__gte=min_margin)
 
     # Role-based filtering
-    if hasattr(request.user, "userprofile"):
-        if request.user.userprofile.is_trader:
-            if isinstance(sales, list):
-                sales = [s for s in sales if s.assigned_trader_id == request.user.pk]
-            else:
-                sales = sales.filter(assigned_trader=request.user)
-
-    # Totals (sale_price and margin_amount are Python properties)
-    total_sales = len(sales) if isinstance(sales, list) else sales.count()
-    total_revenue = sum(sale.sale_price for sale in sales)
-    total_margin = sum(sale.margin_amount for sale in sales)
-    total_commission = sum(sale.commission_amount or 0 for sale in sales)
+    if hasattr(request.user, "userprofile") and request.user.userprofile.is_trader:
+        sales = sales.filter(assigned_trader=request.user)
+
+    # Totals from the SQL annotations (one aggregate query)
+    totals = sales.aggregate(
+        total_sales=Count("id"),
+        total_revenue=Sum("total_price"),
+        total_margin=Sum("margin"),
+        total_commission=Sum("net_commission"),
+    )
+    total_sales = totals["total_sales"]
+    total_revenue = totals["total_revenue"] or Decimal("0")
+    total_margin = totals["total_margin"] or Decimal("0")
+    total_commission = totals["total_commission"] or Decimal("0")
 
     avg_sale_price = total_revenue / total_sales if total_sales > 0 else 0
     avg_margin = total_margin / total_sales if total_sales > 0 else 0
     margin_percentage = (total_margin / total_revenue * 100) if total_revenue > 0 else 0
 
-    # Grouped data
+    # Grouped data — one GROUP BY query over the with_margin() annotations
     grouped_data = []
     if form.is_valid():
         group_by = form.cleaned_data.get("group_by", "month")
-        from collections import defaultdict
+        group_totals = {
+            "sales_count": Count("id"),
+            "revenue": Sum("total_price"),
+            "profit": Sum("margin"),
+            "commission": Sum("net_commission"),
+        }
 
         if group_by == "month":
-            monthly_data = defaultdict(
-                lambda: {
-                    "sales_count": 0,
-                    "revenue": Decimal("0"),
-                    "margin": Decimal("0"),
-                    "commission": Decimal("0"),
-                }
+            rows = (
+                sales.annotate(month=TruncMonth("sale_date"))
+                .values("month")
+                .annotate(**group_totals)
+                .order_by("month")
             )
-            for sale in sales:
-                key = sale.sale_date.strftime("%Y-%m")
-                monthly_data[key]["sales_count"] += 1
-                monthly_data[key]["revenue"] += sale.sale_price
-                monthly_data[key]["margin"] += sale.margin_amount
-                monthly_data[key]["commission"] += sale.commission_amount or 0
-
             grouped_data = [
-                {
-                    "label": datetime.strptime(m, "%Y-%m").strftime("%B %Y"),
-                    "sales_count": d["sales_count"],
-                    "revenue": d["revenue"],
-                    "margin": d["margin"],
-                    "commission": d["commission"],
-                    "margin_percentage": (
-                        (d["margin"] / d["revenue"] * 100) if d["revenue"] > 0 else 0
-                    ),
-                }
-                for m, d in sorted(monthly_data.items())
+                _grouped_row(row["month"].strftime("%B %Y"), row) for row in rows
             ]
 
         elif group_by == "trader":
-            trader_data = defaultdict(
-                lambda: {
-                    "sales_count": 0,
-                    "revenue": Decimal("0"),
-                    "margin": Decimal("0"),
-                    "commission": Decimal("0"),
-                }
-            )
-            for sale in sales:
-                name = (
-                    sale.assigned_trader.get_full_name()
-                    or sale.assigned_trader.username
+            rows = (
+                sales.values(
+                    "assigned_trader_id",
+                    trader_name=_full_name("assigned_trader__"),
                 )
-                trader_data[name]["sales_count"] += 1
-                trader_data[name]["revenue"] += sale.sale_price
-                trader_data[name]["margin"] += sale.margin_amount
-                trader_data[name]["commission"] += sale.commission_amount or 0
-
-            grouped_data = [
-                {
-                    "label": name,
-                    "sales_count": d["sales_count"],
-                    "revenue": d["revenue"],
-                    "margin": d["margin"],
-                    "commission": d["commission"],
-                    "margin_percentage": (
-                        (d["margin"] / d["revenue"] * 100) if d["revenue"] > 0 else 0
-                    ),
-                }
-                for name, d in sorted(trader_data.items())
-            ]
+                .annotate(**group_totals)
+                .order_by("trader_name")
+            )
+            grouped_data = [_grouped_row(row["trader_name"], row) for row in rows]
 
         elif group_by == "customer":
-            customer_data = defaultdict(
-                lambda: {
-                    "sales_count": 0,
-                    "revenue": Decimal("0"),
-                    "margin": Decimal("0"),
-                    "commission": Decimal("0"),
-                }
+            rows = (
+                sales.values("customer_id", "customer__name")
+                .annotate(**group_totals)
+                .order_by("-revenue")
             )
-            for sale in sales:
-                key = sale.customer.name
-                customer_data[key]["sales_count"] += 1
-                customer_data[key]["revenue"] += sale.sale_price
-                customer_data[key]["margin"] += sale.margin_amount
-                customer_data[key]["commission"] += sale.commission_amount or 0
-
-            grouped_data = [
-                {
-                    "label": name,
-                    "sales_count": d["sales_count"],
-                    "revenue": d["revenue"],
-                    "margin": d["margin"],
-                    "commission": d["commission"],
-                    "margin_percentage": (
-                        (d["margin"] / d["revenue"] * 100) if d["revenue"] > 0 else 0
-                    ),
-                }
-                for name, d in sorted(
-                    customer_data.items(), key=lambda x: x[1]["revenue"], reverse=True
-                )
-            ]
+            grouped_data = [_grouped_row(row["customer__name"], row) for row in rows]
 
         elif group_by == "vehicle_make":
-            make_data = defaultdict(
-                lambda: {
-                    "sales_count": 0,
-                    "revenue": Decimal("0"),
-                    "margin": Decimal("0"),
-                    "commission": Decimal("0"),
-                }
+            # A sale can have multiple vehicles of different makes, so group the
+            # line items; commission is apportioned by each line's share of the
+            # sale total
+            money = DecimalField(max_digits=15, decimal_places=2)
+            sale_total = Subquery(
+                SaleLineItem.objects.filter(sale=OuterRef("sale"))
+                .order_by()
+                .values("sale")
+                .annotate(total=Sum("sale_price"))
+                .values("total"),
+                output_field=money,
             )
-            for sale in sales:
-                # A sale can have multiple vehicles of different makes
-                for item in sale.line_items.all():
-                    make = item.vehicle.make
-                    make_data[make]["sales_count"] += 1
-                    make_data[make]["revenue"] += item.sale_price
-                    make_data[make]["margin"] += item.margin_amount
-                    # Apportion commission proportionally per line item
-                    if sale.sale_price > 0 and sale.commission_amount:
-                        make_data[make]["commission"] += (
-                            sale.commission_amount * item.sale_price / sale.sale_price
-                        )
-
-            grouped_data = [
-                {
-                    "label": make,
-                    "sales_count": d["sales_count"],
-                    "revenue": d["revenue"],
-                    "margin": d["margin"],
-                    "commission": d["commission"],
-                    "margin_percentage": (
-                        (d["margin"] / d["revenue"] * 100) if d["revenue"] > 0 else 0
+            rows = (
+                SaleLineItem.objects.with_margin()
+                .filter(sale__in=sales.values("pk"))
+                .values("vehicle__make")
+                .annotate(
+                    sales_count=Count("id"),
+                    revenue=Sum("sale_price"),
+                    profit=Sum("margin"),
+                    commission=Sum(
+                        F("sale__commission_amount")
+                        * F("sale_price")
+                        / NullIf(sale_total, 0),
+                        output_field=money,
                     ),
-                }
-                for make, d in sorted(
-                    make_data.items(), key=lambda x: x[1]["revenue"], reverse=True
                 )
-            ]
+                .order_by("-revenue")
+            )
+            grouped_data = [_grouped_row(row["vehicle__make"], row) for row in rows]
 
-    # Top performing vehicle models — iterate via line_items
-    vehicle_performance = {}
-    for sale in sales:
-        for item in sale.line_items.all():
-            vehicle_key = f"{item.vehicle.make} {item.vehicle.model}"
-            if vehicle_key not in vehicle_performance:
-                vehicle_performance[vehicle_key] = {
-                    "count": 0,
-                    "revenue": Decimal("0"),
-                    "margin": Decimal("0"),
-                }
-            vehicle_performance[vehicle_key]["count"] += 1
-            vehicle_performance[vehicle_key]["revenue"] += item.sale_price
-            vehicle_performance[vehicle_key]["margin"] += item.margin_amount
-
-    top_vehicles = sorted(
-        [
-            {
-                "vehicle": vehicle,
-                "count": data["count"],
-                "revenue": data["revenue"],
-                "margin": data["margin"],
-                "avg_margin": data["margin"] / data["count"] if data["count"] else 0,
-            }
-            for vehicle, data in vehicle_performance.items()
-        ],
-        key=lambda x: x["margin"],
-        reverse=True,
-    )[:10]
+    # Top performing vehicle models — grouped, averaged, ordered and limited
+    # in SQL, so only ten rows come back
+    top_vehicles = [
+        {
+            "vehicle": f"{row['vehicle__make']} {row['vehicle__model']}",
+            "count": row["count"],
+            "revenue": row["revenue"],
+            "margin": row["profit"],
+            "avg_margin": row["avg_margin"],
+        }
+        for row in SaleLineItem.objects.with_margin()
+        .filter(sale__in=sales.values("pk"))
+        .values("vehicle__make", "vehicle__model")
+        .annotate(
+            count=Count("id"),
+            revenue=Sum("sale_price"),
+            profit=Sum("margin"),
+            avg_margin=Avg("margin"),
+        )
+        .order_by("-profit")[:10]
+    ]
+
+    # Detail panel (rendered with the grouped data): its own 20-row query.
+    # Price and margin come from the with_margin() annotations, so only the
+    # vehicle names are prefetched
+    sales_list = []
+    if grouped_data:
+        sales_list = list(
+            sales.prefetch_related(
+                Prefetch("line_items", SaleLineItem.objects.select_related("vehicle"))
+            )[:20]
+        )
+    for sale in sales_list:
+        sale.margin_pct = (
+            sale.margin / sale.total_cost * 100 if sale.total_cost > 0 else 0
+        )
 
     # Pre-serialize chart data (avoids locale number-format issues in JS)
     def _f(v):
-        return float(v) if isinstance(v, Decimal) else float(v or 0)
+        # SQL sums can carry more than two decimal places
+        return round(float(v or 0), 2)
 
     chart_grouped_data = json.dumps(
         {
@@ -362,24 +355,39 @@ def profit_analysis(request):
         "net_profit": total_margin - total_commission,
         "grouped_data": grouped_data,
         "top_vehicles": top_vehicles,
-        "sales_list": sales[:20] if not isinstance(sales, list) else sales[:20],
+        "sales_list": sales_list,
         "chart_grouped_data": chart_grouped_data,
     }
 
     return render(request, "reports/profit_analysis.html", context)
 
 
+def _days_ago(today, days):
+    """Midnight UTC `days` days before `today`, for created_at comparisons.
+
+    Vehicle.days_in_stock counts whole days between created_at's UTC date and
+    today, so days_in_stock <= n exactly when created_at >= _days_ago(today, n).
+    """
+    return datetime.combine(
+        today - timedelta(days=days), time.min, tzinfo=dt_timezone.utc
+    )
+
+
 @login_required
 def inventory_status(request):
     """Inventory status report"""
 
     form = InventoryStatusForm(request.GET or None)
 
+    today = timezone.now().date()
+    # Vehicle.days_in_stock is 0 outside these statuses
+    in_stock = Q(status__in=["available", "reserved", "sold"])
+
     # purchase_line_item is the real FK; vehicle_purchase is a backward-compat property
-    vehicles = Vehicle.objects.select_related(
+    # total_cost (from with_landed_cost) is filtered, summed and listed in SQL,
+    # so only the supplier is joined for display
+    vehicles = Vehicle.objects.with_landed_cost().select_related(
         "purchase_line_item__purchase__supplier",
-        "purchase_line_item__purchase__freight_cost",
-        "purchase_line_item__purchase__customs_declaration",
         "reserved_by",
     )
 
@@ -405,74 +413,86 @@ def inventory_status(request):
         if year_to:
             vehicles = vehicles.filter(year__lte=year_to)
 
-        # landed_cost is a Python property — filter in Python
         min_landed_cost = form.cleaned_data.get("min_landed_cost")
+        if min_landed_cost:
+            vehicles = vehicles.filter(total_cost__gte=min_landed_cost)
+
         max_landed_cost = form.cleaned_data.get("max_landed_cost")
+        if max_landed_cost:
+            vehicles = vehicles.filter(total_cost__lte=max_landed_cost)
+
         days_in_stock_min = form.cleaned_data.get("days_in_stock_min")
+        if days_in_stock_min:
+            vehicles = vehicles.filter(
+                in_stock, created_at__lt=_days_ago(today, days_in_stock_min - 1)
+            )
 
-        if min_landed_cost or max_landed_cost or days_in_stock_min:
-            vehicles = list(vehicles)
-            if min_landed_cost:
-                vehicles = [v for v in vehicles if v.landed_cost >= min_landed_cost]
-            if max_landed_cost:
-                vehicles = [v for v in vehicles if v.landed_cost <= max_landed_cost]
-            if days_in_stock_min:
-                vehicles = [v for v in vehicles if v.days_in_stock >= days_in_stock_min]
-
-    # Materialize to list for Python-level property access
-    if not isinstance(vehicles, list):
-        vehicles_list = list(vehicles)
-    else:
-        vehicles_list = vehicles
+    breakdown_totals = {"count": Count("id"), "value": Sum("total_cost")}
+
+    # Status breakdown, in STATUS_CHOICES order
+    status_rows = {
+        row["status"]: row
+        for row in vehicles.values("status").annotate(**breakdown_totals).order_by()
+    }
+    status_breakdown = {
+        label: {
+            "count": status_rows[code]["count"],
+            "value": status_rows[code]["value"] or Decimal("0"),
+        }
+        for code, label in Vehicle.STATUS_CHOICES
+        if code in status_rows
+    }
 
-    total_vehicles = len(vehicles_list)
-    total_value = sum(v.landed_cost for v in vehicles_list)
+    total_vehicles = sum(row["count"] for row in status_breakdown.values())
+    total_value = sum((row["value"] for row in status_breakdown.values()), Decimal("0"))
     avg_value = total_value / total_vehicles if total_vehicles > 0 else 0
 
-    # Status breakdown
-    status_breakdown = {}
-    for vehicle in vehicles_list:
-        label = vehicle.get_status_display()
-        if label not in status_breakdown:
-            status_breakdown[label] = {"count": 0, "value": Decimal("0")}
-        status_breakdown[label]["count"] += 1
-        status_breakdown[label]["value"] += vehicle.landed_cost
-
-    # Supplier breakdown — via purchase_line_item (select_related already loaded it)
-    supplier_breakdown = {}
-    for vehicle in vehicles_list:
-        if vehicle.purchase_line_item_id and vehicle.purchase_line_item.purchase_id:
-            supplier_name = vehicle.purchase_line_item.purchase.supplier.name
-        else:
-            supplier_name = "—"
-        if supplier_name not in supplier_breakdown:
-            supplier_breakdown[supplier_name] = {"count": 0, "value": Decimal("0")}
-        supplier_breakdown[supplier_name]["count"] += 1
-        supplier_breakdown[supplier_name]["value"] += vehicle.landed_cost
-
-    # Age analysis
+    # Supplier breakdown
+    supplier_name = "purchase_line_item__purchase__supplier__name"
+    supplier_breakdown = {
+        row[supplier_name] or "—": {
+            "count": row["count"],
+            "value": row["value"] or Decimal("0"),
+        }
+        for row in vehicles.values(supplier_name)
+        .annotate(**breakdown_totals)
+        .order_by(supplier_name)
+    }
+
+    # Age analysis — a vehicle created on or after _days_ago(today, n) has been
+    # in stock for at most n days
     age_breakdown = {
         "0–30 jours": {"count": 0, "value": Decimal("0")},
         "31–60 jours": {"count": 0, "value": Decimal("0")},
         "61–90 jours": {"count": 0, "value": Decimal("0")},
         "90+ jours": {"count": 0, "value": Decimal("0")},
     }
-    for vehicle in vehicles_list:
-        days = vehicle.days_in_stock
-        if days <= 30:
-            cat = "0–30 jours"
-        elif days <= 60:
-            cat = "31–60 jours"
-        elif days <= 90:
-            cat = "61–90 jours"
-        else:
-            cat = "90+ jours"
-        age_breakdown[cat]["count"] += 1
-        age_breakdown[cat]["value"] += vehicle.landed_cost
-
-    slow_moving = [
-        v for v in vehicles_list if v.days_in_stock > 90 and v.status == "available"
-    ]
+    age_rows = (
+        vehicles.annotate(
+            age_bucket=Case(
+                When(
+                    ~in_stock | Q(created_at__gte=_days_ago(today, 30)),
+                    then=Value("0–30 jours"),
+                ),
+                When(created_at__gte=_days_ago(today, 60), then=Value("31–60 jours")),
+                When(created_at__gte=_days_ago(today, 90), then=Value("61–90 jours")),
+                default=Value("90+ jours"),
+            )
+        )
+        .values("age_bucket")
+        .annotate(**breakdown_totals)
+        .order_by()
+    )
+    for row in age_rows:
+        age_breakdown[row["age_bucket"]] = {
+            "count": row["count"],
+            "value": row["value"] or Decimal("0"),
+        }
+
+    slow_moving_count = vehicles.filter(
+        status="available", created_at__lt=_days_ago(today, 90)
+    ).count()
+    vehicles_list = vehicles[:50]
 
     context = {
         "form": form,
@@ -482,8 +502,8 @@ def inventory_status(request):
         "status_breakdown": status_breakdown,
         "supplier_breakdown": supplier_breakdown,
         "age_breakdown": age_breakdown,
-        "slow_moving": slow_moving,
-        "vehicles_list": vehicles_list[:50],
+        "slow_moving_count": slow_moving_count,
+        "vehicles_list": vehicles_list,
     }
 
     return render(request, "reports/inventory_status.html", context)
@@ -521,19 +541,19 @@ def sales_summary(request):
             sales = sales.filter(payment_method=payment_method)
 
     # Role-based filtering
-    if hasattr(request.user, "userprofile"):
-        if request.user.userprofile.is_trader:
-            sales = sales.filter(assigned_trader=request.user)
-
-    total_sales = sales.count()
-
-    # sale_price is a property — aggregate via line_items at DB level
-    total_revenue = sales.aggregate(total=Sum("line_items__sale_price"))[
-        "total"
-    ] or Decimal("0")
-    total_commission = sales.aggregate(total=Sum("commission_amount"))[
-        "total"
-    ] or Decimal("0")
+    if hasattr(request.user, "userprofile") and request.user.userprofile.is_trader:
+        sales = sales.filter(assigned_trader=request.user)
+
+    # One aggregate query; with_margin() sums line items in a subquery, so the
+    # commission is not repeated per line item as it would be over a join
+    totals = sales.with_margin().aggregate(
+        total_sales=Count("id"),
+        total_revenue=Sum("total_price"),
+        total_commission=Sum("net_commission"),
+    )
+    total_sales = totals["total_sales"]
+    total_revenue = totals["total_revenue"] or Decimal("0")
+    total_commission = totals["total_commission"] or Decimal("0")
     avg_sale_price = total_revenue / total_sales if total_sales > 0 else Decimal("0")
 
     # Period analysis
@@ -718,10 +738,11 @@ def payment_status(request):
 
     form = PaymentStatusForm(request.GET or None)
 
-    # Invoice links to Sale; Sale no longer has a direct vehicle FK
-    invoices = Invoice.objects.select_related(
-        "customer", "sale__assigned_trader"
-    ).prefetch_related("payments", "sale__line_items__vehicle")
+    # Invoice links to Sale; Sale no longer has a direct vehicle FK.
+    # Payments are not read per row (amount_paid/balance_due are stored on the
+    # invoice), so they are not prefetched. Joins are added to the listed
+    # slice only; the aggregates below do not need them.
+    invoices = Invoice.objects.all()
 
     # Apply filters
     if form.is_valid():
@@ -757,42 +778,72 @@ def payment_status(request):
             invoices = invoices.filter(total_ttc__lte=amount_max)
 
     # Role-based filtering
-    if hasattr(request.user, "userprofile"):
-        if request.user.userprofile.is_trader:
-            invoices = invoices.filter(sale__assigned_trader=request.user)
+    if hasattr(request.user, "userprofile") and request.user.userprofile.is_trader:
+        invoices = invoices.filter(sale__assigned_trader=request.user)
 
     # Statistics
-    total_invoices = invoices.count()
-    total_amount = invoices.aggregate(Sum("total_ttc"))["total_ttc__sum"] or 0
-    total_paid = invoices.aggregate(Sum("amount_paid"))["amount_paid__sum"] or 0
-    total_outstanding = invoices.aggregate(Sum("balance_due"))["balance_due__sum"] or 0
-
-    status_breakdown = invoices.values("status").annotate(
-        count=Count("id"), amount=Sum("total_ttc"), outstanding=Sum("balance_due")
-    )
-
-    overdue_invoices = invoices.filter(
-        due_date__lt=timezone.now().date(), balance_due__gt=0
+    totals = invoices.aggregate(
+        total_invoices=Count("id"),
+        total_amount=Sum("total_ttc"),
+        total_paid=Sum("amount_paid"),
+        total_outstanding=Sum("balance_due"),
     )
+    total_invoices = totals["total_invoices"]
+    total_amount = totals["total_amount"] or 0
+    total_paid = totals["total_paid"] or 0
+    total_outstanding = totals["total_outstanding"] or 0
+
+    # Status breakdown, in INVOICE_STATUS order and labelled from its choices
+    status_rows = {
+        row["status"]: row
+        for row in invoices.values("status")
+        .annotate(
+            count=Count("id"), amount=Sum("total_ttc"), outstanding=Sum("balance_due")
+        )
+        .order_by()
+    }
+    status_breakdown = [
+        dict(status_rows[code], label=label)
+        for code, label in Invoice.INVOICE_STATUS
+        if code in status_rows
+    ]
 
+    # Overdue aging in one GROUP BY. Invoice.days_overdue is 0 unless the
+    # invoice is issued, otherwise today - due_date, so each bucket is a
+    # due_date cut-off.
+    today = timezone.now().date()
     overdue_breakdown = {
         "1–30 jours": {"count": 0, "amount": Decimal("0")},
         "31–60 jours": {"count": 0, "amount": Decimal("0")},
         "61–90 jours": {"count": 0, "amount": Decimal("0")},
         "90+ jours": {"count": 0, "amount": Decimal("0")},
     }
-    for invoice in overdue_invoices:
-        days_overdue = invoice.days_overdue
-        if days_overdue <= 30:
-            cat = "1–30 jours"
-        elif days_overdue <= 60:
-            cat = "31–60 jours"
-        elif days_overdue <= 90:
-            cat = "61–90 jours"
-        else:
-            cat = "90+ jours"
-        overdue_breakdown[cat]["count"] += 1
-        overdue_breakdown[cat]["amount"] += invoice.balance_due
+    overdue_rows = (
+        invoices.filter(due_date__lt=today, balance_due__gt=0)
+        .annotate(
+            bucket=Case(
+                When(
+                    ~Q(status="issued") | Q(due_date__gte=today - timedelta(days=30)),
+                    then=Value("1–30 jours"),
+                ),
+                When(
+                    due_date__gte=today - timedelta(days=60), then=Value("31–60 jours")
+                ),
+                When(
+                    due_date__gte=today - timedelta(days=90), then=Value("61–90 jours")
+                ),
+                default=Value("90+ jours"),
+            )
+        )
+        .values("bucket")
+        .annotate(count=Count("id"), amount=Sum("balance_due"))
+        .order_by()
+    )
+    for row in overdue_rows:
+        overdue_breakdown[row["bucket"]] = {
+            "count": row["count"],
+            "amount": row["amount"] or Decimal("0"),
+        }
 
     top_outstanding = (
         invoices.filter(balance_due__gt=0)
@@ -811,7 +862,16 @@ def payment_status(request):
         "status_breakdown": status_breakdown,
         "overdue_breakdown": overdue_breakdown,
         "top_outstanding": top_outstanding,
-        "invoices_list": invoices[:50],
+        "invoices_list": invoices.select_related("customer", "sale").only(
+            "invoice_number",
+            "customer__name",
+            "sale__id",
+            "total_ttc",
+            "amount_paid",
+            "balance_due",
+            "status",
+            "due_date",
+        )[:50],
     }
 
     return render(request, "reports/payment_status.html", context)
@@ -830,21 +890,27 @@ def export_report(request):
 
             report_type = request.session.get("last_report_type", "profit_analysis")
 
+            # Each exporter serializes once and returns (filename, content,
+            # mimetype); the same bytes back the response or the email
             if format_type == "excel":
-                response = export_to_excel(request, report_type)
+                export = export_to_excel(request, report_type)
             elif format_type == "csv":
-                response = export_to_csv(request, report_type)
+                export = export_to_csv(request, report_type)
             elif format_type == "pdf":
-                response = export_to_pdf(request, report_type, include_charts)
+                export = export_to_pdf(request, report_type, include_charts)
             else:
                 messages.error(request, "Format d'export invalide.")
                 return redirect("reports:export_report")
 
             if email_to:
-                send_report_email(email_to, response, report_type, format_type)
+                send_report_email(email_to, export, report_type, format_type)
                 messages.success(request, f"Rapport envoyé par email à {email_to}")
                 return redirect("reports:dashboard")
 
+            filename, content, mimetype = export
+            disposition = "inline" if format_type == "pdf" else "attachment"
+            response = HttpResponse(content, content_type=mimetype)
+            response["Content-Disposition"] = f'{disposition}; filename="{filename}"'
             return response
     else:
         form = ReportExportForm()
@@ -852,13 +918,113 @@ def export_report(request):
     return render(request, "reports/export.html", {"form": form})
 
 
+def _export_sales():
+    """Latest 500 finalized sales as flat dicts for the Excel/CSV exports.
+
+    Columns come from values() over Sale.objects.with_margin(), and the
+    vehicles of all rows are fetched in one extra query, so no Sale, Customer
+    or line item instances are built.
+    """
+    sales = list(
+        Sale.objects.with_margin()
+        .filter(is_finalized=True)
+        .order_by("-sale_date")
+        .values(
+            "pk",
+            "sale_date",
+            "sale_number",
+            "payment_method",
+            "total_price",
+            "margin",
+            "commission_amount",
+            "customer__name",
+            trader=_full_name("assigned_trader__"),
+        )[:500]
+    )
+
+    vehicles = {}
+    for sale_id, make, model, year in (
+        SaleLineItem.objects.filter(sale_id__in=[sale["pk"] for sale in sales])
+        .order_by("line_number")
+        .values_list("sale_id", "vehicle__make", "vehicle__model", "vehicle__year")
+    ):
+        vehicles.setdefault(sale_id, []).append(f"{make} {model} {year}")
+
+    payment_methods = dict(Sale.PAYMENT_METHODS)
+    for sale in sales:
+        sale["vehicles"] = ", ".join(vehicles.get(sale["pk"], [])) or "—"
+        sale["payment_method"] = payment_methods.get(
+            sale["payment_method"], sale["payment_method"]
+        )
+        yield sale
+
+
+def _export_vehicles(*ordering):
+    """First 500 vehicles as flat dicts (with days_in_stock and landed cost)"""
+    today = timezone.now().date()
+    status_display = dict(Vehicle.STATUS_CHOICES)
+    vehicles = (
+        Vehicle.objects.with_landed_cost()
+        .order_by(*ordering)
+        .values(
+            "make",
+            "model",
+            "year",
+            "color",
+            "vin_chassis",
+            "status",
+            "created_at",
+            "total_cost",
+            "purchase_line_item__purchase__supplier__name",
+        )[:500]
+    )
+    for vehicle in vehicles.iterator(chunk_size=500):
+        status = vehicle["status"]
+        # Same rule as Vehicle.days_in_stock
+        vehicle["days_in_stock"] = (
+            (today - vehicle["created_at"].date()).days
+            if status in ("available", "reserved", "sold")
+            else 0
+        )
+        vehicle["status"] = status_display.get(status, status)
+        vehicle["supplier"] = (
+            vehicle["purchase_line_item__purchase__supplier__name"] or "—"
+        )
+        yield vehicle
+
+
+def _export_invoices():
+    """Latest 500 invoices as flat dicts"""
+    status_display = dict(Invoice.INVOICE_STATUS)
+    invoices = (
+        Invoice.objects.order_by("-invoice_date")
+        .values(
+            "invoice_number",
+            "customer__name",
+            "invoice_date",
+            "due_date",
+            "total_ttc",
+            "amount_paid",
+            "balance_due",
+            "status",
+        )[:500]
+    )
+    for invoice in invoices.iterator(chunk_size=500):
+        invoice["status"] = status_display.get(invoice["status"], invoice["status"])
+        yield invoice
+
+
+def _money(value):
+    return round(float(value or 0), 2)
+
+
 def export_to_excel(request, report_type):
-    """Export report to Excel format"""
+    """Export report to Excel format, as (filename, content, mimetype)"""
     import openpyxl
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Rapport"
+    # Write-only mode streams rows to the file instead of keeping every cell
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Rapport")
 
     if report_type == "profit_analysis":
         ws.append(
@@ -872,26 +1038,16 @@ def export_to_excel(request, report_type):
                 "Commission (DA)",
             ]
         )
-        sales = (
-            Sale.objects.filter(is_finalized=True)
-            .select_related("customer", "assigned_trader")
-            .prefetch_related(
-                "line_items__vehicle__purchase_line_item__purchase__freight_cost",
-                "line_items__vehicle__purchase_line_item__purchase__customs_declaration",
-            )
-            .order_by("-sale_date")[:500]
-        )
-        for sale in sales:
+        for sale in _export_sales():
             ws.append(
                 [
-                    sale.sale_date.strftime("%d/%m/%Y"),
-                    sale.vehicles_display,
-                    sale.customer.name,
-                    sale.assigned_trader.get_full_name()
-                    or sale.assigned_trader.username,
-                    float(sale.sale_price),
-                    float(sale.margin_amount),
-                    float(sale.commission_amount or 0),
+                    sale["sale_date"].strftime("%d/%m/%Y"),
+                    sale["vehicles"],
+                    sale["customer__name"],
+                    sale["trader"],
+                    _money(sale["total_price"]),
+                    _money(sale["margin"]),
+                    _money(sale["commission_amount"]),
                 ]
             )
 
@@ -909,28 +1065,18 @@ def export_to_excel(request, report_type):
                 "Fournisseur",
             ]
         )
-        vehicles = Vehicle.objects.select_related(
-            "purchase_line_item__purchase__supplier",
-            "purchase_line_item__purchase__freight_cost",
-            "purchase_line_item__purchase__customs_declaration",
-        ).order_by("status", "-created_at")[:500]
-        for v in vehicles:
-            supplier = (
-                v.purchase_line_item.purchase.supplier.name
-                if v.purchase_line_item_id
-                else "—"
-            )
+        for v in _export_vehicles("status", "-created_at"):
             ws.append(
                 [
-                    v.make,
-                    v.model,
-                    v.year,
-                    v.color,
-                    v.vin_chassis,
-                    v.get_status_display(),
-                    v.days_in_stock,
-                    float(v.landed_cost),
-                    supplier,
+                    v["make"],
+                    v["model"],
+                    v["year"],
+                    v["color"],
+                    v["vin_chassis"],
+                    v["status"],
+                    v["days_in_stock"],
+                    _money(v["total_cost"]),
+                    v["supplier"],
                 ]
             )
 
@@ -947,24 +1093,17 @@ def export_to_excel(request, report_type):
                 "Commission (DA)",
             ]
         )
-        sales = (
-            Sale.objects.filter(is_finalized=True)
-            .select_related("customer", "assigned_trader")
-            .prefetch_related("line_items__vehicle")
-            .order_by("-sale_date")[:500]
-        )
-        for sale in sales:
+        for sale in _export_sales():
             ws.append(
                 [
-                    sale.sale_date.strftime("%d/%m/%Y"),
-                    sale.sale_number,
-                    sale.vehicles_display,
-                    sale.customer.name,
-                    sale.assigned_trader.get_full_name()
-                    or sale.assigned_trader.username,
-                    sale.get_payment_method_display(),
-                    float(sale.sale_price),
-                    float(sale.commission_amount or 0),
+                    sale["sale_date"].strftime("%d/%m/%Y"),
+                    sale["sale_number"],
+                    sale["vehicles"],
+                    sale["customer__name"],
+                    sale["trader"],
+                    sale["payment_method"],
+                    _money(sale["total_price"]),
+                    _money(sale["commission_amount"]),
                 ]
             )
 
@@ -981,42 +1120,35 @@ def export_to_excel(request, report_type):
                 "Statut",
             ]
         )
-        invoices = Invoice.objects.select_related("customer").order_by("-invoice_date")[
-            :500
-        ]
-        for inv in invoices:
+        for inv in _export_invoices():
             ws.append(
                 [
-                    inv.invoice_number,
-                    inv.customer.name,
-                    inv.invoice_date.strftime("%d/%m/%Y"),
-                    inv.due_date.strftime("%d/%m/%Y"),
-                    float(inv.total_ttc),
-                    float(inv.amount_paid),
-                    float(inv.balance_due),
-                    inv.get_status_display(),
+                    inv["invoice_number"],
+                    inv["customer__name"],
+                    inv["invoice_date"].strftime("%d/%m/%Y"),
+                    inv["due_date"].strftime("%d/%m/%Y"),
+                    _money(inv["total_ttc"]),
+                    _money(inv["amount_paid"]),
+                    _money(inv["balance_due"]),
+                    inv["status"],
                 ]
             )
 
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return (
+        f"rapport_{report_type}.xlsx",
+        buffer.getvalue(),
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
-    response["Content-Disposition"] = (
-        f'attachment; filename="rapport_{report_type}.xlsx"'
-    )
-    wb.save(response)
-    return response
 
 
 def export_to_csv(request, report_type):
-    """Export report to CSV format"""
+    """Export report to CSV format, as (filename, content, mimetype)"""
     import csv
 
-    response = HttpResponse(content_type="text/csv; charset=utf-8-sig")
-    response["Content-Disposition"] = (
-        f'attachment; filename="rapport_{report_type}.csv"'
-    )
-    writer = csv.writer(response)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
 
     if report_type == "profit_analysis":
         writer.writerow(
@@ -1030,26 +1162,16 @@ def export_to_csv(request, report_type):
                 "Commission (DA)",
             ]
         )
-        sales = (
-            Sale.objects.filter(is_finalized=True)
-            .select_related("customer", "assigned_trader")
-            .prefetch_related(
-                "line_items__vehicle__purchase_line_item__purchase__freight_cost",
-                "line_items__vehicle__purchase_line_item__purchase__customs_declaration",
-            )
-            .order_by("-sale_date")[:500]
-        )
-        for sale in sales:
+        for sale in _export_sales():
             writer.writerow(
                 [
-                    sale.sale_date.strftime("%d/%m/%Y"),
-                    sale.vehicles_display,
-                    sale.customer.name,
-                    sale.assigned_trader.get_full_name()
-                    or sale.assigned_trader.username,
-                    float(sale.sale_price),
-                    float(sale.margin_amount),
-                    float(sale.commission_amount or 0),
+                    sale["sale_date"].strftime("%d/%m/%Y"),
+                    sale["vehicles"],
+                    sale["customer__name"],
+                    sale["trader"],
+                    _money(sale["total_price"]),
+                    _money(sale["margin"]),
+                    _money(sale["commission_amount"]),
                 ]
             )
 
@@ -1066,27 +1188,17 @@ def export_to_csv(request, report_type):
                 "Fournisseur",
             ]
         )
-        vehicles = Vehicle.objects.select_related(
-            "purchase_line_item__purchase__supplier",
-            "purchase_line_item__purchase__freight_cost",
-            "purchase_line_item__purchase__customs_declaration",
-        ).order_by("status")[:500]
-        for v in vehicles:
-            supplier = (
-                v.purchase_line_item.purchase.supplier.name
-                if v.purchase_line_item_id
-                else "—"
-            )
+        for v in _export_vehicles("status"):
             writer.writerow(
                 [
-                    v.make,
-                    v.model,
-                    v.year,
-                    v.vin_chassis,
-                    v.get_status_display(),
-                    v.days_in_stock,
-                    float(v.landed_cost),
-                    supplier,
+                    v["make"],
+                    v["model"],
+                    v["year"],
+                    v["vin_chassis"],
+                    v["status"],
+                    v["days_in_stock"],
+                    _money(v["total_cost"]),
+                    v["supplier"],
                 ]
             )
 
@@ -1102,22 +1214,16 @@ def export_to_csv(request, report_type):
                 "Commission (DA)",
             ]
         )
-        sales = (
-            Sale.objects.filter(is_finalized=True)
-            .select_related("customer", "assigned_trader")
-            .prefetch_related("line_items__vehicle")
-            .order_by("-sale_date")[:500]
-        )
-        for sale in sales:
+        for sale in _export_sales():
             writer.writerow(
                 [
-                    sale.sale_date.strftime("%d/%m/%Y"),
-                    sale.sale_number,
-                    sale.vehicles_display,
-                    sale.customer.name,
-                    sale.get_payment_method_display(),
-                    float(sale.sale_price),
-                    float(sale.commission_amount or 0),
+                    sale["sale_date"].strftime("%d/%m/%Y"),
+                    sale["sale_number"],
+                    sale["vehicles"],
+                    sale["customer__name"],
+                    sale["payment_method"],
+                    _money(sale["total_price"]),
+                    _money(sale["commission_amount"]),
                 ]
             )
 
@@ -1133,39 +1239,72 @@ def export_to_csv(request, report_type):
                 "Statut",
             ]
         )
-        invoices = Invoice.objects.select_related("customer").order_by("-invoice_date")[
-            :500
-        ]
-        for inv in invoices:
+        for inv in _export_invoices():
             writer.writerow(
                 [
-                    inv.invoice_number,
-                    inv.customer.name,
-                    inv.due_date.strftime("%d/%m/%Y"),
-                    float(inv.total_ttc),
-                    float(inv.amount_paid),
-                    float(inv.balance_due),
-                    inv.get_status_display(),
+                    inv["invoice_number"],
+                    inv["customer__name"],
+                    inv["due_date"].strftime("%d/%m/%Y"),
+                    _money(inv["total_ttc"]),
+                    _money(inv["amount_paid"]),
+                    _money(inv["balance_due"]),
+                    inv["status"],
                 ]
             )
 
-    return response
+    # Encoded once, so the BOM is written only at the start of the file
+    return (
+        f"rapport_{report_type}.csv",
+        buffer.getvalue().encode("utf-8-sig"),
+        "text/csv; charset=utf-8",
+    )
+
+
+@functools.cache
+def _weasyprint():
+    """WeasyPrint's HTML class and a shared FontConfiguration, or None.
+
+    WeasyPrint is optional (it also needs the system Pango libraries); the
+    font configuration is built once per process instead of per export.
+    """
+    try:
+        from weasyprint import HTML
+        from weasyprint.text.fonts import FontConfiguration
+    except (ImportError, OSError):
+        return None
+    return HTML, FontConfiguration()
 
 
 def export_to_pdf(request, report_type, include_charts=False):
-    """Export report to printable HTML/PDF"""
+    """Export report to PDF, as (filename, content, mimetype).
+
+    Falls back to the printable HTML page when WeasyPrint is not installed.
+    """
     from django.template.loader import render_to_string
 
     context = {"report_type": report_type, "request": request}
     html_content = render_to_string("reports/pdf_export.html", context, request=request)
 
-    response = HttpResponse(html_content, content_type="text/html; charset=utf-8")
-    response["Content-Disposition"] = f'inline; filename="rapport_{report_type}.html"'
-    return response
+    weasyprint = _weasyprint()
+    if weasyprint is None:
+        return (
+            f"rapport_{report_type}.html",
+            html_content.encode("utf-8"),
+            "text/html; charset=utf-8",
+        )
+
+    HTML, font_config = weasyprint
+    pdf = HTML(
+        string=html_content, base_url=request.build_absolute_uri("/")
+    ).write_pdf(font_config=font_config)
+    return (f"rapport_{report_type}.pdf", pdf, "application/pdf")
 
 
 def send_report_email(email_to, attachment, report_type, format_type):
-    """Send report via email"""
+    """Send report via email.
+
+    `attachment` is the (filename, content, mimetype) tuple an exporter returns.
+    """
     from django.core.mail import EmailMessage
 
     subject = f"Rapport {report_type} — {timezone.now().strftime('%d/%m/%Y')}"
@@ -1174,12 +1313,7 @@ def send_report_email(email_to, attachment, report_type, format_type):
     )
 
     email = EmailMessage(subject=subject, body=body, to=[email_to])
-    filename = f"rapport_{report_type}.{format_type}"
-    email.attach(
-        filename,
-        attachment.content,
-        attachment.get("Content-Type", "application/octet-stream"),
-    )
+    email.attach(*attachment)
     email.send()
 
 
@@ -1192,47 +1326,47 @@ def ajax_chart_data(request):
         period = int(request.GET.get("period", "6"))
     except ValueError:
         period = 6
+    # Number of calendar months shown, current month included
+    period = min(max(period, 1), 36)
 
     end_date = timezone.now().date()
-    start_date = end_date.replace(day=1) - timedelta(days=period * 30)
-
-    if chart_type == "monthly_sales":
-        sales = Sale.objects.filter(
-            sale_date__gte=start_date, sale_date__lte=end_date, is_finalized=True
-        ).prefetch_related("line_items")
+    start_date = end_date.replace(day=1) - relativedelta(months=period - 1)
 
-        from collections import defaultdict
-
-        monthly_data = defaultdict(lambda: {"count": 0, "revenue": 0.0})
-
-        for sale in sales:
-            key = sale.sale_date.strftime("%Y-%m")
-            monthly_data[key]["count"] += 1
-            monthly_data[key]["revenue"] += float(sale.sale_price)
+    def monthly_sales_chart():
+        # One GROUP BY per month; line_items joins fan out, hence distinct count
+        rows = (
+            Sale.objects.filter(
+                sale_date__gte=start_date, sale_date__lte=end_date, is_finalized=True
+            )
+            .annotate(month=TruncMonth("sale_date"))
+            .values("month")
+            .annotate(
+                count=Count("id", distinct=True),
+                revenue=Sum("line_items__sale_price"),
+            )
+            .order_by("month")
+        )
 
-        sorted_keys = sorted(monthly_data.keys())
         chart_data = {
-            "labels": [
-                datetime.strptime(m, "%Y-%m").strftime("%b %Y") for m in sorted_keys
-            ],
+            "labels": [row["month"].strftime("%b %Y") for row in rows],
             "datasets": [
                 {
                     "label": "Nombre de ventes",
-                    "data": [monthly_data[m]["count"] for m in sorted_keys],
+                    "data": [row["count"] for row in rows],
                     "backgroundColor": "rgba(54, 162, 235, 0.2)",
                     "borderColor": "rgba(54, 162, 235, 1)",
                 },
                 {
                     "label": "Chiffre d'affaires (DA)",
-                    "data": [monthly_data[m]["revenue"] for m in sorted_keys],
+                    "data": [float(row["revenue"] or 0) for row in rows],
                     "backgroundColor": "rgba(255, 99, 132, 0.2)",
                     "borderColor": "rgba(255, 99, 132, 1)",
                 },
             ],
         }
-        return JsonResponse(chart_data)
+        return chart_data
 
-    elif chart_type == "inventory_status":
+    def inventory_status_chart():
         status_data = Vehicle.objects.values("status").annotate(count=Count("id"))
         chart_data = {
             "labels": [
@@ -1251,6 +1385,18 @@ def ajax_chart_data(request):
                 }
             ],
         }
+        return chart_data
+
+    builders = {
+        "monthly_sales": monthly_sales_chart,
+        "inventory_status": inventory_status_chart,
+    }
+    if chart_type in builders:
+        chart_data = cache.get_or_set(
+            chart_cache_key(chart_type, period, end_date),
+            builders[chart_type],
+            CHART_CACHE_TIMEOUT,
+        )
         return JsonResponse(chart_data)
 
     return JsonResponse({"error": "Invalid chart type"}, status=400)
@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from import_export import resources, fields
 from import_export.admin import ImportExportModelAdmin
+from import_export.instance_loaders import CachedInstanceLoader
 from .models import Sale, SaleLineItem, Invoice
 
 
@@ -19,6 +21,9 @@ class SaleLineItemInline(admin.TabularInline):
 class InvoiceInline(admin.StackedInline):
     model = Invoice
     extra = 0
+    # Invoice.sale is one-to-one, so there is never more than one form
+    max_num = 1
+    raw_id_fields = ("customer",)
     readonly_fields = (
         "invoice_number",
         "subtotal_ht",
@@ -31,8 +36,31 @@ class InvoiceInline(admin.StackedInline):
 # ── Sale ──────────────────────────────────────────────────────────────────────
 
 
+class SaleResource(resources.ModelResource):
+    class Meta:
+        model = Sale
+        # Existing rows are matched on sale_number, all loaded in one IN query
+        import_id_fields = ("sale_number",)
+        instance_loader_class = CachedInstanceLoader
+        # Rows identical to the stored sale are not re-saved (no save() side
+        # effects or commission recalculation for unchanged data)
+        skip_unchanged = True
+        # Exports stream the queryset with iterator() in chunks of this size
+        chunk_size = 5000
+
+    def get_import_fields(self):
+        # Timestamps are exported without microseconds and maintained by the
+        # model, so they are not read back (otherwise no row is "unchanged")
+        return [
+            field
+            for field in super().get_import_fields()
+            if field.attribute not in ("created_at", "updated_at")
+        ]
+
+
 @admin.register(Sale)
 class SaleAdmin(ImportExportModelAdmin):
+    resource_class = SaleResource
 
     list_display = (
         "sale_number",
@@ -68,6 +96,8 @@ class SaleAdmin(ImportExportModelAdmin):
         "vehicle_count_display",
     )
     inlines = [SaleLineItemInline, InvoiceInline]
+    list_select_related = ("customer", "assigned_trader")
+    raw_id_fields = ("customer", "assigned_trader")
 
     fieldsets = (
         (
@@ -113,15 +143,30 @@ class SaleAdmin(ImportExportModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        # Price and vehicle count as SQL annotations, so the changelist does
+        # not query every sale's line items
+        return (
+            super()
+            .get_queryset(request)
+            .with_margin()
+            .annotate(line_item_count=Count("line_items", distinct=True))
+        )
+
     def vehicle_count_display(self, obj):
+        if hasattr(obj, "line_item_count"):
+            return obj.line_item_count
         return obj.vehicle_count
 
     vehicle_count_display.short_description = "Nb. véhicules"
+    vehicle_count_display.admin_order_field = "line_item_count"
 
     def sale_price_display(self, obj):
-        return f"{obj.sale_price:,.2f} DA"
+        price = obj.total_price if hasattr(obj, "total_price") else obj.sale_price
+        return f"{price:,.2f} DA"
 
     sale_price_display.short_description = "Prix de vente (DA)"
+    sale_price_display.admin_order_field = "total_price"
 
     def margin_amount_display(self, obj):
         return f"{obj.margin_amount:,.2f} DA"
@@ -170,6 +215,23 @@ class SaleLineItemAdmin(admin.ModelAdmin):
 # ── Invoice ───────────────────────────────────────────────────────────────────
 
 
+class OverdueFilter(admin.SimpleListFilter):
+    """Filter on the is_overdue_db annotation (see InvoiceQuerySet.with_overdue)"""
+
+    title = "En retard"
+    parameter_name = "overdue"
+
+    def lookups(self, request, model_admin):
+        return (("yes", "Oui"), ("no", "Non"))
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.filter(is_overdue_db=True)
+        if self.value() == "no":
+            return queryset.filter(is_overdue_db=False)
+        return queryset
+
+
 class InvoiceResource(resources.ModelResource):
     class Meta:
         model = Invoice
@@ -183,11 +245,22 @@ class InvoiceResource(resources.ModelResource):
             "balance_due",
             "status",
         )
+        import_id_fields = ("invoice_number",)
+        instance_loader_class = CachedInstanceLoader
+        skip_unchanged = True
+        chunk_size = 5000
+
+    def filter_export(self, queryset, **kwargs):
+        # Join customer/sale for their exported columns and load only what
+        # is exported (one query instead of two lookups per row)
+        return queryset.select_related("customer", "sale").only(*self._meta.fields)
 
 
 @admin.register(Invoice)
 class InvoiceAdmin(ImportExportModelAdmin):
     resource_class = InvoiceResource
+    list_select_related = ("customer",)
+    raw_id_fields = ("sale", "customer")
     list_display = (
         "invoice_number",
         "invoice_date",
@@ -198,7 +271,7 @@ class InvoiceAdmin(ImportExportModelAdmin):
         "status",
         "is_overdue_display",
     )
-    list_filter = ("status", "invoice_date", "due_date", "created_at")
+    list_filter = ("status", OverdueFilter, "invoice_date", "due_date", "created_at")
     search_fields = ("invoice_number", "customer__name", "sale__sale_number")
     readonly_fields = (
         "invoice_number",
@@ -244,11 +317,17 @@ class InvoiceAdmin(ImportExportModelAdmin):
         ),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_overdue()
+
     def is_overdue_display(self, obj):
+        if hasattr(obj, "is_overdue_db"):
+            return obj.is_overdue_db
         return obj.is_overdue
 
     is_overdue_display.boolean = True
     is_overdue_display.short_description = "En retard"
+    is_overdue_display.admin_order_field = "is_overdue_db"
 
     def days_overdue_display(self, obj):
         return f"{obj.days_overdue} jours" if obj.days_overdue > 0 else "-"
@@ -5,6 +5,11 @@ from inventory.models import Vehicle
 from customers.models import Customer
 from django.contrib.auth.models import User
 from django.db.models import Q
+from core.forms import CachedSelect
+
+# Fixed filter choices, built once at import
+_PAYMENT_METHOD_CHOICES = (("", "Tous les modes"),) + tuple(Sale.PAYMENT_METHODS)
+_FINALIZED_CHOICES = (("", "Tous"), ("true", "Finalisées"), ("false", "Brouillons"))
 
 
 class VehicleSelect(forms.Select):
@@ -55,9 +60,22 @@ class SaleForm(forms.ModelForm):
         self.user = kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
 
-        self.fields["customer"].queryset = Customer.objects.filter(is_active=True)
-        self.fields["assigned_trader"].queryset = User.objects.filter(
-            userprofile__role__in=["trader", "manager"], is_active=True
+        # Only the columns the option labels (__str__) need. The trader's
+        # profile is joined so the chosen user's role and commission rate
+        # (Sale.clean, the sale views) need no further query.
+        self.fields["customer"].queryset = Customer.objects.filter(
+            is_active=True
+        ).only("name", "customer_type")
+        self.fields["assigned_trader"].queryset = (
+            User.objects.filter(
+                userprofile__role__in=["trader", "manager"], is_active=True
+            )
+            .select_related("userprofile")
+            .only(
+                "username",
+                "userprofile__role",
+                "userprofile__default_commission_rate",
+            )
         )
 
         if not self.instance.pk:
@@ -65,14 +83,15 @@ class SaleForm(forms.ModelForm):
 
             self.fields["sale_date"].initial = timezone.now().date()
 
-            # Pre-populate assigned_trader with current user (trader or manager)
-            if self.user and hasattr(self.user, "userprofile"):
-                if self.user.userprofile.role in ("trader", "manager"):
-                    self.fields["assigned_trader"].initial = self.user
-                    # Pre-populate commission rate from their profile
-                    self.fields["commission_rate"].initial = (
-                        self.user.userprofile.default_commission_rate
-                    )
+            # Pre-populate assigned_trader with current user (trader or manager).
+            # request.user comes with its profile joined (ProfileModelBackend).
+            profile = getattr(self.user, "userprofile", None)
+            if profile and profile.role in ("trader", "manager"):
+                self.fields["assigned_trader"].initial = self.user
+                # Pre-populate commission rate from their profile
+                self.fields["commission_rate"].initial = (
+                    profile.default_commission_rate
+                )
 
 
 class SaleLineItemForm(forms.ModelForm):
@@ -101,13 +120,15 @@ class SaleLineItemForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         # On edit: include the already-assigned (sold) vehicle so it shows up
         if self.instance.pk and self.instance.vehicle_id:
-            self.fields["vehicle"].queryset = Vehicle.objects.filter(
+            vehicles = Vehicle.objects.filter(
                 Q(status__in=["available", "reserved"]) | Q(pk=self.instance.vehicle_id)
-            ).select_related("purchase_line_item__purchase__supplier")
+            )
         else:
-            self.fields["vehicle"].queryset = Vehicle.objects.filter(
-                status__in=["available", "reserved"]
-            ).select_related("purchase_line_item__purchase__supplier")
+            vehicles = Vehicle.objects.filter(status__in=["available", "reserved"])
+        # Options show Vehicle.__str__ only; landed costs are fetched via AJAX
+        self.fields["vehicle"].queryset = vehicles.only(
+            "make", "model", "year", "vin_chassis"
+        )
 
         self.fields["vehicle"].label = "Véhicule"
         self.fields["sale_price"].label = "Prix de vente (DA)"
@@ -187,14 +208,14 @@ class SaleSearchForm(forms.Form):
         widget=forms.DateInput(attrs={"type": "date", "class": "field-input"}),
     )
     payment_method = forms.ChoiceField(
-        choices=[("", "Tous les modes")] + Sale.PAYMENT_METHODS,
+        choices=_PAYMENT_METHOD_CHOICES,
         required=False,
-        widget=forms.Select(attrs={"class": "field-input"}),
+        widget=CachedSelect(attrs={"class": "field-input"}),
     )
     is_finalized = forms.ChoiceField(
-        choices=[("", "Tous"), ("true", "Finalisées"), ("false", "Brouillons")],
+        choices=_FINALIZED_CHOICES,
         required=False,
-        widget=forms.Select(attrs={"class": "field-input"}),
+        widget=CachedSelect(attrs={"class": "field-input"}),
     )
 
 
@@ -202,7 +223,9 @@ class QuickSaleForm(forms.Form):
     """Single-vehicle quick sale — saved as one SaleLineItem."""
 
     vehicle = forms.ModelChoiceField(
-        queryset=Vehicle.objects.filter(status="available"),
+        queryset=Vehicle.objects.filter(status="available").only(
+            "make", "model", "year", "vin_chassis"
+        ),
         widget=forms.Select(attrs={"class": "field-input"}),
         label="Véhicule",
     )
@@ -226,16 +249,13 @@ class QuickSaleForm(forms.Form):
     def save(self, user=None):
         from django.utils import timezone
 
+        profile = getattr(user, "userprofile", None)
         sale = Sale.objects.create(
             customer=self.cleaned_data["customer"],
             payment_method=self.cleaned_data["payment_method"],
             sale_date=timezone.now().date(),
             assigned_trader=user,
-            commission_rate=(
-                user.userprofile.default_commission_rate
-                if user and hasattr(user, "userprofile")
-                else 0
-            ),
+            commission_rate=profile.default_commission_rate if profile else 0,
             created_by=user,
         )
         SaleLineItem.objects.create(
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-16 11:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_passport_document_customer_profile_photo_and_more'),
+        ('sales', '0003_invoice_timbre_fiscal'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(condition=models.Q(('balance_due__gt', 0)), fields=['due_date'], name='inv_overdue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['is_finalized', 'sale_date'], name='sale_final_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['assigned_trader', 'sale_date'], name='sale_trader_date_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 12:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_passport_document_customer_profile_photo_and_more'),
+        ('sales', '0004_invoice_inv_overdue_idx_sale_sale_final_date_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['-invoice_date', '-created_at'], name='inv_date_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['-sale_date', '-created_at'], name='sale_date_created_idx'),
+        ),
+    ]
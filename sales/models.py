@@ -1,12 +1,62 @@
 from django.db import models
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.utils.functional import cached_property
 from decimal import Decimal
-from core.models import BaseModel
+from core.models import BaseModel, DailyCounter
 from inventory.models import Vehicle
 from customers.models import Customer
+from purchases.models import landed_cost_da_expression
+
+
+class SaleQuerySet(models.QuerySet):
+    def with_margin(self):
+        """
+        Annotate the SQL equivalents of the financial properties:
+        total_price (sale_price), total_cost (landed_cost), margin
+        (margin_amount) and net_commission (commission_amount or 0).
+
+        Line-item sums are correlated subqueries, so the annotations can be
+        filtered and aggregated without fanning out over line_items joins.
+        """
+        money = models.DecimalField(max_digits=15, decimal_places=2)
+        zero = Value(Decimal("0"), output_field=money)
+
+        def line_item_sum(expression):
+            return Coalesce(
+                Subquery(
+                    SaleLineItem.objects.filter(sale=OuterRef("pk"))
+                    .order_by()
+                    .values("sale")
+                    .annotate(total=Sum(expression, output_field=money))
+                    .values("total"),
+                    output_field=money,
+                ),
+                zero,
+            )
+
+        return self.annotate(
+            total_price=line_item_sum("sale_price"),
+            total_cost=line_item_sum(
+                landed_cost_da_expression("vehicle__purchase_line_item__")
+            ),
+            net_commission=Coalesce("commission_amount", zero),
+        ).annotate(margin=F("total_price") - F("total_cost"))
+
+
+class SaleLineItemQuerySet(models.QuerySet):
+    def with_margin(self):
+        """
+        Annotate total_cost (vehicle.landed_cost) and margin (margin_amount)
+        per line item, as SQL expressions usable in filters and GROUP BYs.
+        """
+        return self.annotate(
+            total_cost=landed_cost_da_expression("vehicle__purchase_line_item__")
+        ).annotate(margin=F("sale_price") - F("total_cost"))
 
 
 class Sale(BaseModel):
@@ -68,10 +118,25 @@ class Sale(BaseModel):
     is_finalized = models.BooleanField(default=False, verbose_name="Finalisée")
     notes = models.TextField(blank=True, verbose_name="Notes")
 
+    objects = SaleQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Vente"
         verbose_name_plural = "Ventes"
         ordering = ["-sale_date", "-created_at"]
+        indexes = [
+            # Report filters: finalized sales in a date range, per trader
+            models.Index(
+                fields=["is_finalized", "sale_date"], name="sale_final_date_idx"
+            ),
+            models.Index(
+                fields=["assigned_trader", "sale_date"], name="sale_trader_date_idx"
+            ),
+            # Default ordering (lists, admin changelist) and sale_date ranges
+            models.Index(
+                fields=["-sale_date", "-created_at"], name="sale_date_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Vente {self.sale_number} — {self.customer.name}"
@@ -103,22 +168,11 @@ class Sale(BaseModel):
 
         today = datetime.now()
         prefix = f"VTE-{today.strftime('%Y%m%d')}"
-        last = (
-            Sale.objects.filter(sale_number__startswith=prefix)
-            .order_by("-sale_number")
-            .first()
-        )
-        if last:
-            try:
-                new_num = int(last.sale_number.split("-")[-1]) + 1
-            except (ValueError, IndexError):
-                new_num = 1
-        else:
-            new_num = 1
-        return f"{prefix}-{new_num:03d}"
+        return DailyCounter.next_number(prefix, Sale, "sale_number")
 
     def recalculate_commission(self):
         """Recalculate commission after line items are saved."""
+        self.clear_cached_totals()
         if self.commission_rate is not None:
             margin = self.calculate_margin()
             self.commission_amount = (
@@ -129,13 +183,20 @@ class Sale(BaseModel):
             )
 
     # ── Aggregated financial properties ───────────────────────────────────────
+    # sale_price and landed_cost walk every line item (and its purchase costs),
+    # so they are computed once per instance; the margin properties reuse them.
 
-    @property
+    def clear_cached_totals(self):
+        """Forget cached sale_price/landed_cost after line items change."""
+        for name in ("sale_price", "landed_cost"):
+            self.__dict__.pop(name, None)
+
+    @cached_property
     def sale_price(self):
         """Total sale price = sum of all line items."""
         return sum((item.sale_price for item in self.line_items.all()), Decimal("0"))
 
-    @property
+    @cached_property
     def landed_cost(self):
         """Total landed cost across all vehicles in this sale."""
         return sum(
@@ -167,7 +228,10 @@ class Sale(BaseModel):
     @property
     def vehicles_display(self):
         """Short display string of vehicles."""
-        items = self.line_items.select_related("vehicle").all()
+        if "line_items" in getattr(self, "_prefetched_objects_cache", {}):
+            items = self.line_items.all()
+        else:
+            items = self.line_items.select_related("vehicle").all()
         return (
             ", ".join(
                 f"{i.vehicle.make} {i.vehicle.model} {i.vehicle.year}" for i in items
@@ -197,6 +261,8 @@ class SaleLineItem(BaseModel):
     line_number = models.PositiveIntegerField(blank=True, verbose_name="N° de ligne")
     notes = models.TextField(blank=True, verbose_name="Notes")
 
+    objects = SaleLineItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Ligne de vente"
         verbose_name_plural = "Lignes de vente"
@@ -228,7 +294,11 @@ class SaleLineItem(BaseModel):
                             {"vehicle": "Ce véhicule n'est pas disponible à la vente."}
                         )
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, recalculate_commission=True, **kwargs):
+        """
+        Pass recalculate_commission=False when saving several line items of
+        one sale in a row, then call sale.recalculate_commission() once.
+        """
         # Auto line_number
         if not self.line_number:
             last = (
@@ -260,7 +330,8 @@ class SaleLineItem(BaseModel):
             Vehicle.objects.filter(pk=self.vehicle_id).update(status="sold")
 
         # Recalculate commission
-        self.sale.recalculate_commission()
+        if recalculate_commission:
+            self.sale.recalculate_commission()
 
     def delete(self, *args, **kwargs):
         vehicle_id = self.vehicle_id
@@ -280,6 +351,26 @@ class SaleLineItem(BaseModel):
         return Decimal("0")
 
 
+class InvoiceQuerySet(models.QuerySet):
+    def with_overdue(self):
+        """
+        Annotate is_overdue_db, the SQL equivalent of Invoice.is_overdue, so
+        overdue invoices can be filtered and sorted in the database.
+        """
+        return self.annotate(
+            is_overdue_db=Case(
+                When(
+                    status="issued",
+                    due_date__lt=timezone.now().date(),
+                    balance_due__gt=0,
+                    then=Value(True),
+                ),
+                default=Value(False),
+                output_field=models.BooleanField(),
+            )
+        )
+
+
 class Invoice(BaseModel):
     """Customer invoice for a vehicle sale (covers all line items)."""
 
@@ -338,10 +429,24 @@ class Invoice(BaseModel):
     )
     notes = models.TextField(blank=True, verbose_name="Notes")
 
+    objects = InvoiceQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Facture"
         verbose_name_plural = "Factures"
         ordering = ["-invoice_date", "-created_at"]
+        indexes = [
+            # Outstanding/overdue invoices (balance_due > 0) by due date
+            models.Index(
+                fields=["due_date"],
+                name="inv_overdue_idx",
+                condition=models.Q(balance_due__gt=0),
+            ),
+            # Default ordering (lists, admin changelist) and invoice_date ranges
+            models.Index(
+                fields=["-invoice_date", "-created_at"], name="inv_date_created_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Facture {self.invoice_number} — {self.customer.name}"
@@ -364,6 +469,7 @@ class Invoice(BaseModel):
             self.status = "paid"
         elif self.amount_paid > 0:
             self.status = "issued"
+        self.__dict__.pop("_overdue", None)
         super().save(*args, **kwargs)
 
     def generate_invoice_number(self):
@@ -371,19 +477,7 @@ class Invoice(BaseModel):
 
         today = datetime.now()
         prefix = f"INV-{today.strftime('%Y%m%d')}"
-        last = (
-            Invoice.objects.filter(invoice_number__startswith=prefix)
-            .order_by("-invoice_number")
-            .first()
-        )
-        if last:
-            try:
-                new_num = int(last.invoice_number.split("-")[-1]) + 1
-            except (ValueError, IndexError):
-                new_num = 1
-        else:
-            new_num = 1
-        return f"{prefix}-{new_num:03d}"
+        return DailyCounter.next_number(prefix, Invoice, "invoice_number")
 
     def calculate_tax_amounts(self):
         """Calculate tax amounts from total sale price (all line items)."""
@@ -404,16 +498,21 @@ class Invoice(BaseModel):
         """Total including timbre fiscal."""
         return self.total_ttc + self.timbre_fiscal
 
-    @property
-    def is_overdue(self):
-        return (
+    @cached_property
+    def _overdue(self):
+        """(is_overdue, days_overdue) from a single date computation."""
+        today = timezone.now().date()
+        overdue = (
             self.status in ["issued"]
-            and self.due_date < timezone.now().date()
+            and self.due_date < today
             and self.balance_due > 0
         )
+        return overdue, (today - self.due_date).days if overdue else 0
+
+    @property
+    def is_overdue(self):
+        return self._overdue[0]
 
     @property
     def days_overdue(self):
-        if self.is_overdue:
-            return (timezone.now().date() - self.due_date).days
-        return 0
+        return self._overdue[1]
@@ -1,7 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Sum, Avg, Count
+from django.db.models import Q, Sum, Avg, Count, Exists, OuterRef, Prefetch
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from .models import Sale, SaleLineItem, Invoice
@@ -16,25 +16,44 @@ from inventory.models import Vehicle
 from core.decorators import trader_required
 from system_settings.models import SystemConfiguration
 
+# Records read by Vehicle.landed_cost, joined so the property needs no
+# queries beyond the container's vehicle count
+_VEHICLE_COST_RELATED = (
+    "purchase_line_item__freight_cost",
+    "purchase_line_item__customs_declaration",
+    "purchase_line_item__purchase__freight_cost",
+    "purchase_line_item__purchase__customs_declaration",
+)
+
 
 @login_required
 def sale_list(request):
-    sales = Sale.objects.select_related(
-        "customer", "assigned_trader", "assigned_trader__userprofile"
-    ).prefetch_related("line_items__vehicle", "invoice")
+    # The list shows trader names only: no profile join, no invoice lookup
+    sales = Sale.objects.select_related("customer", "assigned_trader").prefetch_related(
+        "line_items__vehicle"
+    )
 
-    search_form = SaleSearchForm(request.GET)
+    # Traders only see (and get stats for) their own sales
+    if hasattr(request.user, "userprofile") and request.user.userprofile.is_trader:
+        sales = sales.filter(assigned_trader=request.user)
+
+    search_form = SaleSearchForm(request.GET or None)
 
     if search_form.is_valid():
         search = search_form.cleaned_data.get("search")
         if search:
+            # Vehicle matches as an EXISTS subquery: no line_items join to
+            # fan rows out, so no DISTINCT over the whole result
+            vehicle_match = SaleLineItem.objects.filter(sale=OuterRef("pk")).filter(
+                Q(vehicle__vin_chassis__icontains=search)
+                | Q(vehicle__make__icontains=search)
+                | Q(vehicle__model__icontains=search)
+            )
             sales = sales.filter(
                 Q(sale_number__icontains=search)
                 | Q(customer__name__icontains=search)
-                | Q(line_items__vehicle__vin_chassis__icontains=search)
-                | Q(line_items__vehicle__make__icontains=search)
-                | Q(line_items__vehicle__model__icontains=search)
-            ).distinct()
+                | Exists(vehicle_match)
+            )
 
         trader = search_form.cleaned_data.get("trader")
         if trader:
@@ -62,30 +81,24 @@ def sale_list(request):
         elif is_finalized == "false":
             sales = sales.filter(is_finalized=False)
 
-    if hasattr(request.user, "userprofile"):
-        if request.user.userprofile.is_trader:
-            sales = sales.filter(assigned_trader=request.user)
-
     sales = sales.annotate(vehicle_count_ann=Count("line_items"))
 
-    # sale_price is a Python property (sum of line items), so compute in Python
-    sales_list = list(sales)
-    total_revenue = sum(sale.sale_price for sale in sales_list)
-    total_sales_count = len(sales_list)
-    stats = {
-        "total_sales": total_sales_count,
-        "total_vehicles": SaleLineItem.objects.filter(sale__in=sales).count(),
-        "total_revenue": total_revenue,
-        "avg_sale_price": (
-            (total_revenue / total_sales_count) if total_sales_count else 0
-        ),
-        "total_commission": sales.aggregate(Sum("commission_amount"))[
-            "commission_amount__sum"
-        ]
-        or 0,
-    }
+    # Stat bar totals in one aggregate query; revenue sums the line items in SQL
+    stats = sales.with_margin().aggregate(
+        total_sales=Count("pk"),
+        total_vehicles=Sum("vehicle_count_ann"),
+        total_revenue=Sum("total_price"),
+        total_commission=Sum("commission_amount"),
+    )
+    for key in ("total_vehicles", "total_revenue", "total_commission"):
+        stats[key] = stats[key] or 0
+    stats["avg_sale_price"] = (
+        (stats["total_revenue"] / stats["total_sales"]) if stats["total_sales"] else 0
+    )
 
-    paginator = Paginator(sales_list, 20)
+    # Only the displayed page is fetched (and its line items prefetched).
+    # The Count annotation groups the query, which drops Meta.ordering.
+    paginator = Paginator(sales.order_by("-sale_date", "-created_at"), 20)
     page_obj = paginator.get_page(request.GET.get("page"))
 
     return render(
@@ -95,7 +108,7 @@ def sale_list(request):
             "page_obj": page_obj,
             "search_form": search_form,
             "stats": stats,
-            "total_count": sales.count(),
+            "total_count": paginator.count,
         },
     )
 
@@ -118,7 +131,8 @@ def sale_create(request):
             items = formset.save(commit=False)
             for item in items:
                 item.created_by = request.user
-                item.save()
+                # Commission is recalculated once, after all items are saved
+                item.save(recalculate_commission=False)
             for obj in formset.deleted_objects:
                 obj.delete()
             sale.recalculate_commission()
@@ -161,9 +175,17 @@ def sale_detail(request, pk):
         Sale.objects.select_related(
             "customer",
             "assigned_trader__userprofile",
-        ).prefetch_related(
-            "line_items__vehicle__purchase_line_item__purchase__supplier",
             "invoice",
+        ).prefetch_related(
+            # Everything Vehicle.landed_cost reads, so the cost and margin
+            # figures are computed without per-item queries
+            Prefetch(
+                "line_items",
+                queryset=SaleLineItem.objects.select_related(
+                    "vehicle__purchase_line_item__purchase__supplier",
+                    *(f"vehicle__{name}" for name in _VEHICLE_COST_RELATED),
+                ).prefetch_related("vehicle__purchase_line_item__purchase__line_items"),
+            ),
         ),
         pk=pk,
     )
@@ -188,7 +210,8 @@ def sale_detail(request, pk):
 
 @trader_required
 def sale_edit(request, pk):
-    sale = get_object_or_404(Sale, pk=pk)
+    # Invoice joined so the hasattr(sale, "invoice") probe needs no query
+    sale = get_object_or_404(Sale.objects.select_related("invoice"), pk=pk)
 
     if hasattr(request.user, "userprofile"):
         if request.user.userprofile.is_trader and sale.assigned_trader != request.user:
@@ -219,7 +242,7 @@ def sale_edit(request, pk):
                 if not item.created_by_id:
                     item.created_by = request.user
                 item.updated_by = request.user
-                item.save()
+                item.save(recalculate_commission=False)
             for obj in formset.deleted_objects:
                 obj.delete()
             sale.recalculate_commission()
@@ -267,7 +290,14 @@ def sale_delete(request, pk):
 
 @trader_required
 def sale_create_invoice(request, pk):
-    sale = get_object_or_404(Sale, pk=pk)
+    # Customer and line items are loaded up front: the item count check, the
+    # invoice totals, the post_save log and the form template all read them
+    sale = get_object_or_404(
+        Sale.objects.select_related("customer", "invoice").prefetch_related(
+            "line_items__vehicle"
+        ),
+        pk=pk,
+    )
 
     if hasattr(request.user, "userprofile"):
         if request.user.userprofile.is_trader and sale.assigned_trader != request.user:
@@ -397,7 +427,7 @@ def sale_finalize(request, pk):
 
         sale.is_finalized = True
         sale.updated_by = request.user
-        sale.save()
+        sale.save(update_fields=["is_finalized", "updated_by", "updated_at"])
         return JsonResponse(
             {"success": True, "message": f"Vente {sale.sale_number} finalisée."}
         )
@@ -412,7 +442,7 @@ def ajax_vehicle_details(request):
         return JsonResponse({"error": "Vehicle ID required"})
     try:
         vehicle = Vehicle.objects.select_related(
-            "purchase_line_item__purchase__supplier"
+            "purchase_line_item__purchase__supplier", *_VEHICLE_COST_RELATED
         ).get(pk=vehicle_id)
         return JsonResponse(
             {
@@ -444,7 +474,9 @@ def ajax_calculate_margin(request):
         if not vehicle_id or not sale_price:
             return JsonResponse({"error": "Missing parameters"})
         try:
-            vehicle = Vehicle.objects.get(pk=vehicle_id)
+            vehicle = Vehicle.objects.select_related(*_VEHICLE_COST_RELATED).get(
+                pk=vehicle_id
+            )
             sale_price = float(sale_price)
             landed_cost = float(vehicle.landed_cost)
             margin_amount = sale_price - landed_cost
@@ -8,6 +8,12 @@ class SupplierResource(resources.ModelResource):
         model = Supplier
         fields = ('name', 'country', 'contact_person', 'phone', 'email', 'address', 'currency__code', 'payment_terms', 'is_active')
         export_order = fields
+        # Exports stream the queryset with iterator() in chunks of this size
+        chunk_size = 5000
+
+    def filter_export(self, queryset, **kwargs):
+        # Join currency for currency__code and load only the exported columns
+        return queryset.select_related("currency").only(*self._meta.fields)
 
 @admin.register(Supplier)
 class SupplierAdmin(ImportExportModelAdmin):
@@ -0,0 +1,20 @@
+import hashlib
+
+from core.cache import bump_version, versioned_key
+
+SEARCH_CACHE_TIMEOUT = 60
+
+
+def search_cache_key(term):
+    """Cache key for one supplier_ajax_search result list.
+
+    icontains ignores case, so the term is lowercased; it is hashed to keep
+    arbitrary user input out of the key.
+    """
+    digest = hashlib.md5(term.lower().encode()).hexdigest()
+    return versioned_key("supplier_search", digest)
+
+
+def invalidate_search():
+    """Expire all cached search results"""
+    bump_version("supplier_search")
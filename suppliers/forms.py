@@ -2,9 +2,17 @@ from django import forms
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit, Reset
 from .models import Supplier
+from core.forms import CachedModelChoiceField
 from core.models import Currency
 
 class SupplierForm(forms.ModelForm):
+
+    # Limit currency choices to foreign currencies (cached option list)
+    currency = CachedModelChoiceField(
+        queryset=Currency.objects.filter(code__in=['USD', 'CNY'], is_active=True),
+        cache_key='supplier_currencies',
+        label="Devise par défaut",
+    )
     
     class Meta:
         model = Supplier
@@ -49,11 +57,6 @@ class SupplierForm(forms.ModelForm):
             )
         )
         
-        # Limit currency choices to foreign currencies
-        self.fields['currency'].queryset = Currency.objects.filter(
-            code__in=['USD', 'CNY'], is_active=True
-        )
-        
         # Set default country
         if not self.instance.pk:
             self.fields['country'].initial = 'Chine'
@@ -76,8 +79,9 @@ class SupplierSearchForm(forms.Form):
         widget=forms.TextInput(attrs={'class': 'form-control'})
     )
     
-    currency = forms.ModelChoiceField(
+    currency = CachedModelChoiceField(
         queryset=Currency.objects.filter(is_active=True),
+        cache_key='currencies',
         required=False,
         empty_label="Toutes les devises",
         widget=forms.Select(attrs={'class': 'form-control'})
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 12:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_dailycounter'),
+        ('suppliers', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supplier',
+            index=models.Index(fields=['is_active', 'name'], name='supp_active_name_idx'),
+        ),
+    ]
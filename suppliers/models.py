@@ -1,7 +1,40 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.validators import EmailValidator
+from django.utils.functional import cached_property
 from core.models import BaseModel, Currency
 
+
+class SupplierQuerySet(models.QuerySet):
+    def with_purchase_totals(self):
+        """
+        Annotate purchase_count (containers) and total_purchase_value (FOB DA
+        of all their vehicles, None without purchases) as correlated
+        subqueries, so the queryset is not grouped and counts stay cheap.
+        """
+        from purchases.models import Purchase, PurchaseLineItem
+
+        purchase_count = (
+            Purchase.objects.filter(supplier=OuterRef("pk"))
+            .order_by()
+            .values("supplier")
+            .annotate(n=Count("pk"))
+            .values("n")
+        )
+        purchase_value = (
+            PurchaseLineItem.objects.filter(purchase__supplier=OuterRef("pk"))
+            .order_by()
+            .values("purchase__supplier")
+            .annotate(total=Sum("fob_price_da"))
+            .values("total")
+        )
+        return self.annotate(
+            purchase_count=Coalesce(Subquery(purchase_count), 0),
+            total_purchase_value=Subquery(purchase_value),
+        )
+
+
 class Supplier(BaseModel):
     """Chinese car suppliers/exporters"""
     
@@ -19,11 +52,17 @@ class Supplier(BaseModel):
     payment_terms = models.CharField(max_length=200, blank=True, verbose_name="Conditions de paiement")
     notes = models.TextField(blank=True, verbose_name="Notes")
     is_active = models.BooleanField(default=True, verbose_name="Actif")
+
+    objects = SupplierQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Fournisseur"
         verbose_name_plural = "Fournisseurs"
         ordering = ['name']
+        indexes = [
+            # Active-only lists and dropdowns, in default name order
+            models.Index(fields=['is_active', 'name'], name='supp_active_name_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -35,7 +74,7 @@ class Supplier(BaseModel):
         if not self.phone and not self.email:
             raise ValidationError("Au moins un moyen de contact (téléphone ou email) est requis.")
     
-    @property
+    @cached_property
     def has_purchases(self):
         """Check if supplier has any vehicle purchases"""
         return self.purchase_set.exists()
@@ -46,8 +85,7 @@ class Supplier(BaseModel):
     
     def get_total_purchase_value(self):
         """Get total purchase value in DA"""
-        return sum(
-            purchase.purchase_price_da 
-            for purchase in self.purchase_set.all()
-            if purchase.purchase_price_da
+        return (
+            self.purchase_set.aggregate(total=Sum("line_items__fob_price_da"))["total"]
+            or 0
         )
\ No newline at end of file
@@ -1,5 +1,8 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from core.forms import invalidate_choices
+from core.models import Currency
+from .cache import invalidate_search
 from .models import Supplier
 
 
@@ -32,3 +35,18 @@ def supplier_post_delete(sender, instance, **kwargs):
         f"Fournisseur supprimé : {instance.name} ({instance.country})",
         instance,
     )
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_supplier_search(sender, instance, **kwargs):
+    # Cached results carry the supplier's currency code
+    invalidate_search()
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_currency_choices(sender, instance, **kwargs):
+    invalidate_choices("currencies", "supplier_currencies")
@@ -1,11 +1,14 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Count, Sum
+from django.db.models import Q, Count, Prefetch, Sum
 from django.core.paginator import Paginator
 from django.http import JsonResponse
+from django.core.cache import cache
 from django.urls import reverse
+from .cache import SEARCH_CACHE_TIMEOUT, search_cache_key
 from .models import Supplier
+from purchases.models import PurchaseLineItem
 from .forms import SupplierForm, SupplierSearchForm
 from core.decorators import finance_required
 
@@ -13,7 +16,7 @@ from core.decorators import finance_required
 @login_required
 def supplier_list(request):
     suppliers = Supplier.objects.all().select_related("currency")
-    search_form = SupplierSearchForm(request.GET)
+    search_form = SupplierSearchForm(request.GET or None)
 
     if search_form.is_valid():
         search = search_form.cleaned_data.get("search")
@@ -36,8 +39,8 @@ def supplier_list(request):
         elif is_active == "false":
             suppliers = suppliers.filter(is_active=False)
 
-    suppliers = suppliers.annotate(purchase_count=Count("purchase"))
-    paginator = Paginator(suppliers, 20)
+    # Subquery annotations: the paginator's COUNT needs no GROUP BY
+    paginator = Paginator(suppliers.with_purchase_totals(), 20)
     page_obj = paginator.get_page(request.GET.get("page"))
 
     return render(
@@ -46,7 +49,7 @@ def supplier_list(request):
         {
             "page_obj": page_obj,
             "search_form": search_form,
-            "total_count": suppliers.count(),
+            "total_count": paginator.count,
         },
     )
 
@@ -86,16 +89,32 @@ def supplier_create(request):
 @login_required
 def supplier_detail(request, pk):
     supplier = get_object_or_404(Supplier, pk=pk)
-    purchases = (
-        supplier.purchase_set.all()
-        .select_related("currency")
-        .prefetch_related("line_items__vehicle")
-        .order_by("-purchase_date")
+    # Only the five shown containers are fetched, with the freight/customs
+    # records PurchaseLineItem.landed_cost_da reads joined in
+    recent_purchases = (
+        supplier.purchase_set.select_related(
+            "currency", "freight_cost", "customs_declaration"
+        )
+        .prefetch_related(
+            Prefetch(
+                "line_items",
+                queryset=PurchaseLineItem.objects.select_related(
+                    "vehicle", "freight_cost", "customs_declaration"
+                ),
+            )
+        )
+        .order_by("-purchase_date")[:5]
     )
 
     # Count individual vehicles (line items), not containers
-    total_purchases = sum(p.line_items.count() for p in purchases)
-    total_value = sum(p.total_fob_da for p in purchases)
+    stats = supplier.purchase_set.aggregate(
+        total_containers=Count("pk", distinct=True),
+        total_purchases=Count("line_items"),
+        total_value=Sum("line_items__fob_price_da"),
+    )
+    supplier.has_purchases = stats["total_containers"] > 0
+    total_purchases = stats["total_purchases"]
+    total_value = stats["total_value"] or 0
     avg_value = total_value / total_purchases if total_purchases > 0 else 0
 
     return render(
@@ -106,8 +125,8 @@ def supplier_detail(request, pk):
             "total_purchases": total_purchases,
             "total_value": total_value,
             "avg_value": avg_value,
-            "recent_purchases": purchases[:5],
-            "total_containers": purchases.count(),
+            "recent_purchases": recent_purchases,
+            "total_containers": stats["total_containers"],
         },
     )
 
@@ -140,7 +159,8 @@ def supplier_edit(request, pk):
 @finance_required
 def supplier_toggle_status(request, pk):
     if request.method == "POST":
-        supplier = get_object_or_404(Supplier, pk=pk)
+        # Only the flag and the name (read by the post_save log) are needed
+        supplier = get_object_or_404(Supplier.objects.only("is_active", "name"), pk=pk)
         if supplier.is_active and supplier.has_purchases:
             return JsonResponse(
                 {
@@ -150,7 +170,7 @@ def supplier_toggle_status(request, pk):
             )
         supplier.is_active = not supplier.is_active
         supplier.updated_by = request.user
-        supplier.save()
+        supplier.save(update_fields=["is_active", "updated_by", "updated_at"])
         status_text = "activé" if supplier.is_active else "désactivé"
         return JsonResponse(
             {
@@ -165,12 +185,21 @@ def supplier_toggle_status(request, pk):
 @login_required
 def supplier_ajax_search(request):
     term = request.GET.get("term", "")
-    suppliers = Supplier.objects.filter(is_active=True, name__icontains=term)[:10]
+
+    def results():
+        rows = Supplier.objects.filter(
+            is_active=True, name__icontains=term
+        ).values_list("id", "name", "currency__code")[:10]
+        return [
+            {"id": pk, "text": name, "currency": currency}
+            for pk, name, currency in rows
+        ]
+
+    # Fired on every keystroke: repeated terms are served from the cache
     return JsonResponse(
         {
-            "results": [
-                {"id": s.id, "text": s.name, "currency": s.currency.code}
-                for s in suppliers
-            ]
+            "results": cache.get_or_set(
+                search_cache_key(term), results, SEARCH_CACHE_TIMEOUT
+            )
         }
     )
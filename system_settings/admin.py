@@ -1,4 +1,9 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+from core.utils import estimate_row_count
 from .models import (
     SystemConfiguration,
     ExchangeRateHistory,
@@ -9,6 +14,43 @@ from .models import (
 )
 
 
+class EstimatedCountPaginator(Paginator):
+    """Paginator that reads the table's row estimate instead of COUNT(*).
+
+    PostgreSQL and MySQL keep a row estimate in their catalogs; other
+    backends (SQLite) have none, and small tables are cheap to count, so both
+    fall back to the exact count. Only valid for unfiltered querysets.
+    """
+
+    exact_count_below = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_row_count(
+            self.object_list.model._meta.db_table, using=self.object_list.db
+        )
+        if estimate is None or estimate < self.exact_count_below:
+            return super().count
+        return estimate
+
+
+class SystemLogChangeList(ChangeList):
+    """Changelist that loads only the listed columns.
+
+    message_short shows at most 50 characters, so only a prefix of the
+    message is read; details, user_agent and the unused user columns stay in
+    the database.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return (
+            super()
+            .get_queryset(request, exclude_parameters)
+            .annotate(message_prefix=Substr("message", 1, 51))
+            .only("level", "action_type", "ip_address", "created_at", "user__username")
+        )
+
+
 @admin.register(SystemConfiguration)
 class SystemConfigurationAdmin(admin.ModelAdmin):
     list_display = (
@@ -87,6 +129,7 @@ class ExchangeRateHistoryAdmin(admin.ModelAdmin):
         "created_at",
     )
     list_filter = ("from_currency", "to_currency", "effective_date")
+    list_select_related = ("from_currency", "to_currency")
     search_fields = ("source", "notes")
     ordering = ("-effective_date", "from_currency")
 
@@ -176,7 +219,9 @@ class UserPreferenceAdmin(admin.ModelAdmin):
         "updated_at",
     )
     list_filter = ("theme", "language", "email_notifications")
-    search_fields = ("user__username", "user__first_name", "user__last_name")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    search_fields = ("user__username",)
 
     fieldsets = (
         ("Utilisateur", {"fields": ("user",)}),
@@ -197,16 +242,34 @@ class SystemLogAdmin(admin.ModelAdmin):
         "created_at",
     )
     list_filter = ("level", "action_type", "created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
     search_fields = ("message", "user__username")
     readonly_fields = ("created_at",)
     ordering = ("-created_at",)
+    # The log table only grows: skip the unfiltered COUNT(*) shown next to
+    # filtered results, and estimate the count when nothing is filtered
+    show_full_result_count = False
+
+    def get_paginator(
+        self, request, queryset, per_page, orphans=0, allow_empty_first_page=True
+    ):
+        filtered = any(key not in (ORDER_VAR, PAGE_VAR) for key in request.GET)
+        paginator_class = self.paginator if filtered else EstimatedCountPaginator
+        return paginator_class(queryset, per_page, orphans, allow_empty_first_page)
 
     # Logs should never be edited through admin — make everything read-only
     def has_change_permission(self, request, obj=None):
         return False
 
+    def get_changelist(self, request, **kwargs):
+        return SystemLogChangeList
+
     def message_short(self, obj):
-        return obj.message[:50] + "..." if len(obj.message) > 50 else obj.message
+        message = getattr(obj, "message_prefix", None)
+        if message is None:
+            message = obj.message
+        return message[:50] + "..." if len(message) > 50 else message
 
     message_short.short_description = "Message"
 
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class SystemSettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'system_settings'
-    verbose_name = 'System Settings'
\ No newline at end of file
+    verbose_name = 'System Settings'
+
+    def ready(self):
+        import system_settings.signals  # noqa
@@ -0,0 +1,31 @@
+from django.core.cache import cache
+
+from core.cache import bump_version, versioned_key
+
+RATE_CACHE_TIMEOUT = 300
+
+# Short, because the default locmem cache is per process: the post_save
+# invalidation only reaches the worker that saved the configuration
+CONFIG_CACHE_TIMEOUT = 30
+CONFIG_CACHE_KEY = "system_config"
+
+
+def rate_cache_key(from_currency_code, to_currency_code, day):
+    """Cache key for one ExchangeRateHistory.get_latest_rate_values() lookup.
+
+    The day is part of the key because the lookup only considers rates
+    effective on or before it.
+    """
+    return versioned_key(
+        "exchange_rate", from_currency_code, to_currency_code, day.isoformat()
+    )
+
+
+def invalidate_rates():
+    """Expire all cached latest rates"""
+    bump_version("exchange_rate")
+
+
+def invalidate_config():
+    """Drop the cached SystemConfiguration"""
+    cache.delete(CONFIG_CACHE_KEY)
@@ -1,6 +1,10 @@
+import functools
+
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, SetPasswordForm
+from django.utils import timezone
+from django.utils.functional import cached_property
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit, Fieldset
 from .models import (
@@ -10,8 +14,101 @@ from .models import (
     UserPreference,
     SystemLog,
 )
+from core.forms import CachedModelChoiceField
 from core.models import Currency, UserProfile
 
+_LOG_LEVEL_CHOICES = (("", "Tous les niveaux"),) + tuple(SystemLog.LOG_LEVELS)
+_ACTION_TYPE_CHOICES = (("", "Toutes les actions"),) + tuple(SystemLog.ACTION_TYPES)
+
+
+# Crispy layouts are static, so each is built once and shared by every form
+# instance; the FormHelper itself is only created when a template asks for it.
+
+@functools.cache
+def _configuration_layout():
+    return Layout(
+        Fieldset(
+            "Informations de l'Entreprise",
+            "company_logo",
+            "company_name",
+            "company_address",
+            Row(
+                Column("company_phone", css_class="form-group col-md-6"),
+                Column("company_email", css_class="form-group col-md-6"),
+            ),
+        ),
+        Fieldset(
+            "Numéros d'Identification Légale",
+            Row(
+                Column("company_nif", css_class="form-group col-md-4"),
+                Column("company_rc", css_class="form-group col-md-4"),
+                Column("company_nis", css_class="form-group col-md-4"),
+            ),
+        ),
+        Fieldset(
+            "Coordonnées Bancaires",
+            Row(
+                Column("bank_name", css_class="form-group col-md-6"),
+                Column("bank_account_number", css_class="form-group col-md-6"),
+            ),
+            "bank_rib",
+        ),
+        Fieldset(
+            "Taux par Défaut",
+            Row(
+                Column("default_tva_rate", css_class="form-group col-md-4"),
+                Column("default_tariff_rate", css_class="form-group col-md-4"),
+                Column("default_commission_rate", css_class="form-group col-md-4"),
+            ),
+        ),
+        Fieldset(
+            "Paramètres Système",
+            Row(
+                Column("reservation_duration_days", css_class="form-group col-md-6"),
+                Column("invoice_due_days", css_class="form-group col-md-6"),
+            ),
+        ),
+        Fieldset(
+            "Notifications",
+            Row(
+                Column("enable_email_notifications", css_class="form-group col-md-4"),
+                Column("enable_overdue_alerts", css_class="form-group col-md-4"),
+                Column("overdue_alert_days", css_class="form-group col-md-4"),
+            ),
+        ),
+        Submit("submit", "Enregistrer la Configuration", css_class="btn btn-primary"),
+    )
+
+
+@functools.cache
+def _exchange_rate_layout():
+    return Layout(
+        Row(
+            Column("from_currency", css_class="form-group col-md-6"),
+            Column("to_currency", css_class="form-group col-md-6"),
+        ),
+        Row(
+            Column("rate", css_class="form-group col-md-6"),
+            Column("effective_date", css_class="form-group col-md-6"),
+        ),
+        "source",
+        "notes",
+        Submit("submit", "Enregistrer le Taux", css_class="btn btn-primary"),
+    )
+
+
+@functools.cache
+def _tax_rate_layout():
+    return Layout(
+        Row(
+            Column("tax_type", css_class="form-group col-md-6"),
+            Column("rate", css_class="form-group col-md-6"),
+        ),
+        "effective_date",
+        "description",
+        Submit("submit", "Enregistrer le Taux", css_class="btn btn-primary"),
+    )
+
 
 class SystemConfigurationForm(forms.ModelForm):
 
@@ -53,67 +150,11 @@ class SystemConfigurationForm(forms.ModelForm):
             "company_logo": forms.ClearableFileInput(attrs={"accept": "image/*"}),
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            Fieldset(
-                "Informations de l'Entreprise",
-                "company_logo",
-                "company_name",
-                "company_address",
-                Row(
-                    Column("company_phone", css_class="form-group col-md-6"),
-                    Column("company_email", css_class="form-group col-md-6"),
-                ),
-            ),
-            Fieldset(
-                "Numéros d'Identification Légale",
-                Row(
-                    Column("company_nif", css_class="form-group col-md-4"),
-                    Column("company_rc", css_class="form-group col-md-4"),
-                    Column("company_nis", css_class="form-group col-md-4"),
-                ),
-            ),
-            Fieldset(
-                "Coordonnées Bancaires",
-                Row(
-                    Column("bank_name", css_class="form-group col-md-6"),
-                    Column("bank_account_number", css_class="form-group col-md-6"),
-                ),
-                "bank_rib",
-            ),
-            Fieldset(
-                "Taux par Défaut",
-                Row(
-                    Column("default_tva_rate", css_class="form-group col-md-4"),
-                    Column("default_tariff_rate", css_class="form-group col-md-4"),
-                    Column("default_commission_rate", css_class="form-group col-md-4"),
-                ),
-            ),
-            Fieldset(
-                "Paramètres Système",
-                Row(
-                    Column(
-                        "reservation_duration_days", css_class="form-group col-md-6"
-                    ),
-                    Column("invoice_due_days", css_class="form-group col-md-6"),
-                ),
-            ),
-            Fieldset(
-                "Notifications",
-                Row(
-                    Column(
-                        "enable_email_notifications", css_class="form-group col-md-4"
-                    ),
-                    Column("enable_overdue_alerts", css_class="form-group col-md-4"),
-                    Column("overdue_alert_days", css_class="form-group col-md-4"),
-                ),
-            ),
-            Submit(
-                "submit", "Enregistrer la Configuration", css_class="btn btn-primary"
-            ),
-        )
+    @cached_property
+    def helper(self):
+        helper = FormHelper()
+        helper.layout = _configuration_layout()
+        return helper
 
 
 class ExchangeRateForm(forms.ModelForm):
@@ -136,23 +177,7 @@ class ExchangeRateForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            Row(
-                Column("from_currency", css_class="form-group col-md-6"),
-                Column("to_currency", css_class="form-group col-md-6"),
-            ),
-            Row(
-                Column("rate", css_class="form-group col-md-6"),
-                Column("effective_date", css_class="form-group col-md-6"),
-            ),
-            "source",
-            "notes",
-            Submit("submit", "Enregistrer le Taux", css_class="btn btn-primary"),
-        )
         if not self.instance.pk:
-            from django.utils import timezone
-
             self.fields["effective_date"].initial = timezone.now().date()
             try:
                 da_currency = Currency.objects.get(code="DA")
@@ -160,6 +185,12 @@ class ExchangeRateForm(forms.ModelForm):
             except Currency.DoesNotExist:
                 pass
 
+    @cached_property
+    def helper(self):
+        helper = FormHelper()
+        helper.layout = _exchange_rate_layout()
+        return helper
+
 
 class TaxRateForm(forms.ModelForm):
 
@@ -173,31 +204,34 @@ class TaxRateForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.helper = FormHelper()
-        self.helper.layout = Layout(
-            Row(
-                Column("tax_type", css_class="form-group col-md-6"),
-                Column("rate", css_class="form-group col-md-6"),
-            ),
-            "effective_date",
-            "description",
-            Submit("submit", "Enregistrer le Taux", css_class="btn btn-primary"),
-        )
         if not self.instance.pk:
-            from django.utils import timezone
-
             self.fields["effective_date"].initial = timezone.now().date()
 
+    @cached_property
+    def helper(self):
+        helper = FormHelper()
+        helper.layout = _tax_rate_layout()
+        return helper
+
+
+class CurrencyCodeChoiceField(CachedModelChoiceField):
+    """Currency select labelled by code only"""
+
+    def label_from_instance(self, obj):
+        return obj.code
+
 
 class ExchangeRateSearchForm(forms.Form):
-    from_currency = forms.ModelChoiceField(
+    from_currency = CurrencyCodeChoiceField(
         queryset=Currency.objects.filter(is_active=True),
+        cache_key="currency_codes",
         required=False,
         empty_label="Toutes les devises source",
         widget=forms.Select(attrs={"class": "form-control"}),
     )
-    to_currency = forms.ModelChoiceField(
+    to_currency = CurrencyCodeChoiceField(
         queryset=Currency.objects.filter(is_active=True),
+        cache_key="currency_codes",
         required=False,
         empty_label="Toutes les devises cible",
         widget=forms.Select(attrs={"class": "form-control"}),
@@ -214,12 +248,12 @@ class ExchangeRateSearchForm(forms.Form):
 
 class SystemLogFilterForm(forms.Form):
     level = forms.ChoiceField(
-        choices=[("", "Tous les niveaux")] + SystemLog.LOG_LEVELS,
+        choices=_LOG_LEVEL_CHOICES,
         required=False,
         widget=forms.Select(attrs={"class": "form-control"}),
     )
     action_type = forms.ChoiceField(
-        choices=[("", "Toutes les actions")] + SystemLog.ACTION_TYPES,
+        choices=_ACTION_TYPE_CHOICES,
         required=False,
         widget=forms.Select(attrs={"class": "form-control"}),
     )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 12:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_settings', '0002_systemconfiguration_bank_account_number_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['-created_at'], name='syslog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', 'action_type', '-created_at'], name='syslog_level_action_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taxratehistory',
+            index=models.Index(fields=['tax_type', '-effective_date'], name='taxrate_type_date_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 12:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system_settings', '0003_systemlog_taxrate_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='systemlog',
+            name='syslog_level_action_idx',
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', '-created_at'], name='syslog_level_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['action_type', '-created_at'], name='syslog_action_created_idx'),
+        ),
+    ]
@@ -1,8 +1,33 @@
+import atexit
+import collections
+import threading
+
+from django.conf import settings
 from django.db import models
+from django.db.models import OuterRef, Subquery
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from core.models import BaseModel, Currency
+from .cache import (
+    CONFIG_CACHE_KEY,
+    CONFIG_CACHE_TIMEOUT,
+    RATE_CACHE_TIMEOUT,
+    rate_cache_key,
+)
+
+# Distinguishes a cache miss from a cached None
+_MISSING = object()
+
+# SystemLog entries waiting for SystemLog.flush_buffer(). Shared by every
+# thread of the process: a flush writes all entries buffered so far
+_LOG_BUFFER = collections.deque()
+_LOG_BUFFER_LOCK = threading.Lock()
+_LOG_BUFFER_SIZE = 50
+
+_LOG_LEVEL_RANK = {"info": 10, "warning": 20, "error": 30, "critical": 40}
+_LOG_MIN_RANK = _LOG_LEVEL_RANK[getattr(settings, "SYSTEMLOG_MIN_LEVEL", "info")]
 
 
 class SystemConfiguration(BaseModel):
@@ -122,11 +147,30 @@ class SystemConfiguration(BaseModel):
 
     @classmethod
     def get_current(cls):
-        """Get current system configuration"""
-        config, created = cls.objects.get_or_create(pk=1)
+        """Get current system configuration (cached briefly, dropped on save)"""
+        config = cache.get(CONFIG_CACHE_KEY)
+        if config is None:
+            config, created = cls.objects.select_related(
+                "default_currency"
+            ).get_or_create(pk=1)
+            cache.set(CONFIG_CACHE_KEY, config, CONFIG_CACHE_TIMEOUT)
         return config
 
 
+class ExchangeRateHistoryQuerySet(models.QuerySet):
+    def latest_per_pair(self):
+        """Keep only the most recent rate of each currency pair in this queryset"""
+        latest = (
+            self.filter(
+                from_currency=OuterRef("from_currency"),
+                to_currency=OuterRef("to_currency"),
+            )
+            .order_by("-effective_date")
+            .values("pk")[:1]
+        )
+        return self.filter(pk=Subquery(latest))
+
+
 class ExchangeRateHistory(BaseModel):
     """Historical exchange rates"""
 
@@ -152,6 +196,8 @@ class ExchangeRateHistory(BaseModel):
     source = models.CharField(max_length=100, blank=True, verbose_name="Source du taux")
     notes = models.TextField(blank=True, verbose_name="Notes")
 
+    objects = ExchangeRateHistoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Historique des taux de change"
         verbose_name_plural = "Historiques des taux de change"
@@ -161,17 +207,73 @@ class ExchangeRateHistory(BaseModel):
     def __str__(self):
         return f"1 {self.from_currency.code} = {self.rate} {self.to_currency.code} ({self.effective_date})"
 
+    @classmethod
+    def get_latest_rate_values(cls, from_currency_code, to_currency_code="DA"):
+        """pk, rate, effective_date and source of the latest effective rate.
+
+        Cached; None when no rate is effective. This is the single lookup
+        behind get_latest_rate() and the latest-rate ajax endpoint.
+        """
+        today = timezone.now().date()
+        key = rate_cache_key(from_currency_code, to_currency_code, today)
+        row = cache.get(key, _MISSING)
+        if row is _MISSING:
+            row = (
+                cls.objects.filter(
+                    from_currency__code=from_currency_code,
+                    to_currency__code=to_currency_code,
+                    effective_date__lte=today,
+                )
+                .order_by("-effective_date")
+                .values("pk", "rate", "effective_date", "source")
+                .first()
+            )
+            cache.set(key, row, RATE_CACHE_TIMEOUT)
+        return row
+
     @classmethod
     def get_latest_rate(cls, from_currency_code, to_currency_code="DA"):
-        """Get latest exchange rate"""
-        try:
-            return cls.objects.filter(
-                from_currency__code=from_currency_code,
-                to_currency__code=to_currency_code,
-                effective_date__lte=timezone.now().date(),
-            ).first()
-        except cls.DoesNotExist:
+        """Get latest exchange rate (None when no rate is effective)"""
+        row = cls.get_latest_rate_values(from_currency_code, to_currency_code)
+        if row is None:
             return None
+        return (
+            cls.objects.select_related("from_currency", "to_currency")
+            .filter(pk=row["pk"])
+            .first()
+        )
+
+    @classmethod
+    def get_latest_rates(cls, from_currency_codes, to_currency_code="DA"):
+        """Latest rate of each source currency, keyed by code, in one query (cached)"""
+        today = timezone.now().date()
+        codes = "batch:" + ",".join(from_currency_codes)
+        key = rate_cache_key(codes, to_currency_code, today)
+        rates = cache.get(key)
+        if rates is None:
+            latest = (
+                cls.objects.filter(
+                    from_currency__code__in=from_currency_codes,
+                    to_currency__code=to_currency_code,
+                    effective_date__lte=today,
+                )
+                .latest_per_pair()
+                .select_related("from_currency", "to_currency")
+            )
+            rates = {rate.from_currency.code: rate for rate in latest}
+            cache.set(key, rates, RATE_CACHE_TIMEOUT)
+        return rates
+
+
+class TaxRateHistoryQuerySet(models.QuerySet):
+    def latest_per_type(self):
+        """Keep only the most recent rate of each tax type in this queryset"""
+        latest = (
+            self.filter(tax_type=OuterRef("tax_type"))
+            .order_by("-effective_date", "-pk")
+            .values("pk")[:1]
+        )
+        return self.filter(pk=Subquery(latest))
 
 
 class TaxRateHistory(BaseModel):
@@ -197,10 +299,18 @@ class TaxRateHistory(BaseModel):
         max_length=200, blank=True, verbose_name="Description"
     )
 
+    objects = TaxRateHistoryQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Historique des taux de taxe"
         verbose_name_plural = "Historiques des taux de taxe"
         ordering = ["-effective_date", "tax_type"]
+        indexes = [
+            # Latest rate of a given tax type
+            models.Index(
+                fields=["tax_type", "-effective_date"], name="taxrate_type_date_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.get_tax_type_display()} - {self.rate}% ({self.effective_date})"
@@ -321,13 +431,38 @@ class SystemLog(BaseModel):
         verbose_name = "Journal système"
         verbose_name_plural = "Journaux système"
         ordering = ["-created_at"]
+        indexes = [
+            # Default ordering (log views, admin changelist) and date ranges
+            models.Index(fields=["-created_at"], name="syslog_created_idx"),
+            # Level or action type filter, newest first
+            models.Index(
+                fields=["level", "-created_at"], name="syslog_level_created_idx"
+            ),
+            models.Index(
+                fields=["action_type", "-created_at"], name="syslog_action_created_idx"
+            ),
+        ]
 
     def __str__(self):
-        return f"{self.get_level_display()} - {self.message[:50]}"
+        # The admin changelist annotates message_prefix and defers message
+        message = getattr(self, "message_prefix", None)
+        if message is None:
+            message = self.message
+        return f"{self.get_level_display()} - {message[:50]}"
 
     @classmethod
     def log(cls, level, action_type, message, user=None, details=None, request=None):
-        """Create a log entry"""
+        """Create a log entry.
+
+        Errors and critical entries are written at once. Other entries are
+        buffered and written in one bulk insert by flush_buffer(), which
+        SystemLogFlushMiddleware calls at the end of each request; until then
+        the returned entry has no pk. Entries below SYSTEMLOG_MIN_LEVEL are
+        dropped and return None.
+        """
+        if _LOG_LEVEL_RANK.get(level, _LOG_MIN_RANK) < _LOG_MIN_RANK:
+            return None
+
         log_entry = cls(
             level=level,
             action_type=action_type,
@@ -340,18 +475,41 @@ class SystemLog(BaseModel):
             log_entry.ip_address = cls.get_client_ip(request)
             log_entry.user_agent = request.META.get("HTTP_USER_AGENT", "")
 
-        log_entry.save()
+        if level in ("error", "critical"):
+            log_entry.save()
+            return log_entry
+
+        with _LOG_BUFFER_LOCK:
+            _LOG_BUFFER.append(log_entry)
+            full = len(_LOG_BUFFER) >= _LOG_BUFFER_SIZE
+        if full:
+            cls.flush_buffer()
         return log_entry
 
+    @classmethod
+    def flush_buffer(cls):
+        """Write all buffered log entries in a single bulk insert"""
+        with _LOG_BUFFER_LOCK:
+            entries = list(_LOG_BUFFER)
+            _LOG_BUFFER.clear()
+        if len(entries) == 1:
+            # A plain INSERT, without bulk_create's transaction
+            entries[0].save()
+        elif entries:
+            cls.objects.bulk_create(entries, batch_size=500)
+
     @staticmethod
     def get_client_ip(request):
         """Get client IP address from request"""
         x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
         if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0]
-        else:
-            ip = request.META.get("REMOTE_ADDR")
-        return ip
+            # Only the first (client) address is needed
+            return x_forwarded_for.partition(",")[0].strip()
+        return request.META.get("REMOTE_ADDR")
+
+
+# Management commands and shells have no request end to flush on
+atexit.register(SystemLog.flush_buffer)
 
 
 class BackupConfiguration(BaseModel):
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from core.forms import invalidate_choices
+from core.models import Currency
+from .cache import invalidate_config, invalidate_rates
+from .models import ExchangeRateHistory, SystemConfiguration
+
+
+@receiver(post_save, sender=ExchangeRateHistory)
+@receiver(post_delete, sender=ExchangeRateHistory)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_latest_rates(sender, instance, **kwargs):
+    invalidate_rates()
+
+
+@receiver(post_save, sender=SystemConfiguration)
+@receiver(post_delete, sender=SystemConfiguration)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_system_config(sender, instance, **kwargs):
+    invalidate_config()
+
+
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_currency_choices(sender, instance, **kwargs):
+    invalidate_choices("currency_codes")
@@ -4,10 +4,13 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Prefetch, Q
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.utils import timezone
+from django.views.decorators.http import require_POST
 from .models import (
     SystemConfiguration,
     ExchangeRateHistory,
@@ -26,8 +29,30 @@ from .forms import (
     AdminSetPasswordForm,
 )
 from core.models import UserProfile
+from core.utils import estimate_row_count
 from core.decorators import manager_required
 
+LOG_DELETE_BATCH_SIZE = 5000
+SESSION_COUNT_CACHE_KEY = "system_status:sessions"
+SESSION_COUNT_CACHE_TIMEOUT = 60
+
+
+class PkSlicePaginator(Paginator):
+    """Paginator that runs the LIMIT/OFFSET on a pk-only query.
+
+    The offset scan reads narrow rows; the page's full rows, with their
+    select_related joins, are then loaded by primary key.
+    """
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        pks = list(self.object_list.values_list("pk", flat=True)[bottom:top])
+        return self._get_page(self.object_list.filter(pk__in=pks), number, self)
+
 
 @manager_required
 def system_configuration(request):
@@ -58,42 +83,42 @@ def system_configuration(request):
 @manager_required
 def exchange_rates(request):
     search_form = ExchangeRateSearchForm(request.GET)
-    rates = ExchangeRateHistory.objects.select_related("from_currency", "to_currency")
+    rates = ExchangeRateHistory.objects.select_related(
+        "from_currency", "to_currency"
+    ).only(
+        "rate",
+        "effective_date",
+        "source",
+        "notes",
+        "from_currency__code",
+        "to_currency__code",
+    )
     if search_form.is_valid():
-        if search_form.cleaned_data.get("from_currency"):
-            rates = rates.filter(
-                from_currency=search_form.cleaned_data["from_currency"]
-            )
-        if search_form.cleaned_data.get("to_currency"):
-            rates = rates.filter(to_currency=search_form.cleaned_data["to_currency"])
-        if search_form.cleaned_data.get("date_from"):
-            rates = rates.filter(
-                effective_date__gte=search_form.cleaned_data["date_from"]
-            )
-        if search_form.cleaned_data.get("date_to"):
-            rates = rates.filter(
-                effective_date__lte=search_form.cleaned_data["date_to"]
-            )
+        # Collect the filters into one Q so the queryset is cloned once
+        cd = search_form.cleaned_data
+        q = Q()
+        if cd.get("from_currency"):
+            q &= Q(from_currency=cd["from_currency"])
+        if cd.get("to_currency"):
+            q &= Q(to_currency=cd["to_currency"])
+        if cd.get("date_from"):
+            q &= Q(effective_date__gte=cd["date_from"])
+        if cd.get("date_to"):
+            q &= Q(effective_date__lte=cd["date_to"])
+        rates = rates.filter(q)
 
-    current_rates = {}
-    for rate in rates:
-        key = f"{rate.from_currency.code}_{rate.to_currency.code}"
-        if (
-            key not in current_rates
-            or rate.effective_date > current_rates[key].effective_date
-        ):
-            current_rates[key] = rate
+    current_rates = rates.latest_per_pair()
 
-    total_count = rates.count()  # single count query
-    paginator = Paginator(rates, 20)
+    paginator = PkSlicePaginator(rates, 20)
     page_obj = paginator.get_page(request.GET.get("page"))
+    total_count = paginator.count
     return render(
         request,
         "system_settings/exchange_rates.html",
         {
             "page_obj": page_obj,
             "search_form": search_form,
-            "current_rates": current_rates.values(),
+            "current_rates": current_rates,
             "total_count": total_count,
         },
     )
@@ -155,22 +180,16 @@ def exchange_rate_edit(request, pk):
 @manager_required
 def tax_rates(request):
     rates = TaxRateHistory.objects.all()
-    current_rates = {}
-    for rate in rates:
-        if (
-            rate.tax_type not in current_rates
-            or rate.effective_date > current_rates[rate.tax_type].effective_date
-        ):
-            current_rates[rate.tax_type] = rate
-    total_count = rates.count()  # single count query
+    current_rates = rates.latest_per_type()
     paginator = Paginator(rates, 20)
     page_obj = paginator.get_page(request.GET.get("page"))
+    total_count = paginator.count
     return render(
         request,
         "system_settings/tax_rates.html",
         {
             "page_obj": page_obj,
-            "current_rates": current_rates.values(),
+            "current_rates": current_rates,
             "total_count": total_count,
         },
     )
@@ -232,33 +251,47 @@ def tax_rate_edit(request, pk):
 @manager_required
 def system_logs(request):
     filter_form = SystemLogFilterForm(request.GET)
-    logs = SystemLog.objects.select_related("user")
+    # A page's entries come from a handful of users: prefetching them gives
+    # one small extra query and a narrower main row than joining auth_user
+    logs = SystemLog.objects.only(
+        "level",
+        "action_type",
+        "message",
+        "details",
+        "ip_address",
+        "created_at",
+        "user",
+    ).prefetch_related(
+        Prefetch("user", queryset=User.objects.only("id", "username"))
+    )
     if filter_form.is_valid():
         cd = filter_form.cleaned_data
+        q = Q()
         if cd.get("level"):
-            logs = logs.filter(level=cd["level"])
+            q &= Q(level=cd["level"])
         if cd.get("action_type"):
-            logs = logs.filter(action_type=cd["action_type"])
+            q &= Q(action_type=cd["action_type"])
         if cd.get("user"):
-            logs = logs.filter(user__username__icontains=cd["user"])
+            q &= Q(user__username__icontains=cd["user"])
         if cd.get("date_from"):
-            logs = logs.filter(created_at__gte=cd["date_from"])
+            q &= Q(created_at__gte=cd["date_from"])
         if cd.get("date_to"):
-            logs = logs.filter(created_at__lte=cd["date_to"])
+            q &= Q(created_at__lte=cd["date_to"])
         if cd.get("search"):
-            logs = logs.filter(message__icontains=cd["search"])
-
-    # FIX #3: single count — reused for both stats and total_count
-    total_count = logs.count()
-    stats = {
-        "total_logs": total_count,
-        "error_count": logs.filter(level="error").count(),
-        "warning_count": logs.filter(level="warning").count(),
-        "info_count": logs.filter(level="info").count(),
-    }
-    critical_logs = logs.filter(level__in=["error", "critical"])[:10]
-    paginator = Paginator(logs, 50)
+            q &= Q(message__icontains=cd["search"])
+        logs = logs.filter(q)
+
+    paginator = PkSlicePaginator(logs, 50)
     page_obj = paginator.get_page(request.GET.get("page"))
+    # The paginator's count is cached — reused for both stats and total_count
+    total_count = paginator.count
+    stats = logs.aggregate(
+        error_count=Count("pk", filter=Q(level="error")),
+        warning_count=Count("pk", filter=Q(level="warning")),
+        info_count=Count("pk", filter=Q(level="info")),
+    )
+    stats["total_logs"] = total_count
+    critical_logs = logs.filter(level__in=["error", "critical"])[:10]
 
     # FIX #4: build a base query string for pagination links that preserves
     # all active filter params (level, action_type, user, search, date_from/to).
@@ -280,28 +313,36 @@ def system_logs(request):
     )
 
 
+@require_POST
 @manager_required
 def clear_old_logs(request):
-    if request.method == "POST":
-        days = int(request.POST.get("days", 30))
-        # FIX #1: timezone has no timedelta — import datetime.timedelta
-        cutoff_date = timezone.now() - timedelta(days=days)
-        deleted_count, _ = SystemLog.objects.filter(created_at__lt=cutoff_date).delete()
-        SystemLog.log(
-            level="info",
-            action_type="system",
-            message=f"Nettoyage des logs: {deleted_count} entrées supprimées (>{days} jours)",
-            user=request.user,
-            request=request,
-        )
-        return JsonResponse(
-            {
-                "success": True,
-                "message": f"{deleted_count} entrées supprimées.",
-                "deleted_count": deleted_count,
-            }
-        )
-    return JsonResponse({"success": False, "message": "Méthode non autorisée."})
+    days = int(request.POST.get("days", 30))
+    # FIX #1: timezone has no timedelta — import datetime.timedelta
+    cutoff_date = timezone.now() - timedelta(days=days)
+    # Delete in bounded batches so a large purge never holds one long
+    # transaction or lock on the whole table
+    old_logs = SystemLog.objects.filter(created_at__lt=cutoff_date).order_by()
+    deleted_count = 0
+    while True:
+        pks = list(old_logs.values_list("pk", flat=True)[:LOG_DELETE_BATCH_SIZE])
+        if not pks:
+            break
+        deleted, _ = SystemLog.objects.filter(pk__in=pks).delete()
+        deleted_count += deleted
+    SystemLog.log(
+        level="info",
+        action_type="system",
+        message=f"Nettoyage des logs: {deleted_count} entrées supprimées (>{days} jours)",
+        user=request.user,
+        request=request,
+    )
+    return JsonResponse(
+        {
+            "success": True,
+            "message": f"{deleted_count} entrées supprimées.",
+            "deleted_count": deleted_count,
+        }
+    )
 
 
 @login_required
@@ -311,14 +352,14 @@ def ajax_latest_exchange_rate(request):
     if not from_currency:
         return JsonResponse({"error": "From currency required"})
     try:
-        rate = ExchangeRateHistory.get_latest_rate(from_currency, to_currency)
+        rate = ExchangeRateHistory.get_latest_rate_values(from_currency, to_currency)
         if rate:
             return JsonResponse(
                 {
                     "success": True,
-                    "rate": float(rate.rate),
-                    "effective_date": rate.effective_date.strftime("%Y-%m-%d"),
-                    "source": rate.source,
+                    "rate": float(rate["rate"]),
+                    "effective_date": rate["effective_date"].strftime("%Y-%m-%d"),
+                    "source": rate["source"],
                 }
             )
         return JsonResponse(
@@ -331,21 +372,26 @@ def ajax_latest_exchange_rate(request):
         return JsonResponse({"error": str(e)})
 
 
-@manager_required
-def system_status(request):
-    from django.db import connection
-
+def _session_count():
+    # The catalog estimate is plenty for a dashboard figure on a large table;
+    # small tables (and SQLite, which keeps none) are counted exactly
+    estimate = estimate_row_count("django_session")
+    if estimate is not None and estimate >= 10000:
+        return estimate
     with connection.cursor() as cursor:
         cursor.execute("SELECT COUNT(*) FROM django_session")
-        active_sessions = cursor.fetchone()[0]
+        return cursor.fetchone()[0]
+
+
+@manager_required
+def system_status(request):
+    active_sessions = cache.get_or_set(
+        SESSION_COUNT_CACHE_KEY, _session_count, SESSION_COUNT_CACHE_TIMEOUT
+    )
 
     recent_logs = SystemLog.objects.select_related("user")[:10]
     config = SystemConfiguration.get_current()
-    current_rates = {}
-    for code in ["USD", "CNY"]:
-        rate = ExchangeRateHistory.get_latest_rate(code, "DA")
-        if rate:
-            current_rates[code] = rate
+    current_rates = ExchangeRateHistory.get_latest_rates(["USD", "CNY"], "DA")
 
     return render(
         request,